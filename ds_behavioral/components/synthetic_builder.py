@@ -1,3 +1,6 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from aistac.handlers.abstract_handlers import ConnectorContract
 from ds_behavioral.components.commons import Commons
@@ -25,12 +28,14 @@ class SyntheticBuilder(AbstractComponent):
         """
         super().__init__(property_manager=property_manager, intent_model=intent_model, default_save=default_save,
                          reset_templates=reset_templates, align_connectors=align_connectors)
+        # the per intent profile of the last profiled synthetic pipeline run
+        self._pipeline_profile = []
 
     @classmethod
     def from_uri(cls, task_name: str, uri_pm_path: str, username: str, pm_file_type: str=None, pm_module: str=None,
                  pm_handler: str=None, pm_kwargs: dict=None, default_save=None, reset_templates: bool=None,
                  align_connectors: bool=None, default_save_intent: bool=None, default_intent_level: bool=None,
-                 order_next_available: bool=None, default_replace_intent: bool=None):
+                 order_next_available: bool=None, default_replace_intent: bool=None, return_type: str=None):
         """ Class Factory Method to instantiates the components application. The Factory Method handles the
         instantiation of the Properties Manager, the Intent Model and the persistence of the uploaded properties.
         See class inline docs for an example method
@@ -50,6 +55,7 @@ class SyntheticBuilder(AbstractComponent):
          :param default_intent_level: (optional) the default level intent should be saved at
          :param order_next_available: (optional) if the default behaviour for the order should be next available order
          :param default_replace_intent: (optional) the default replace existing intent behaviour
+         :param return_type: (optional) the type the intent methods return, 'list' or 'array'. default to 'list'
          :return: the initialised class instance
          """
         pm_file_type = pm_file_type if isinstance(pm_file_type, str) else 'pickle'
@@ -59,7 +65,8 @@ class SyntheticBuilder(AbstractComponent):
         _intent_model = SyntheticIntentModel(property_manager=_pm, default_save_intent=default_save_intent,
                                              default_intent_level=default_intent_level,
                                              order_next_available=order_next_available,
-                                             default_replace_intent=default_replace_intent)
+                                             default_replace_intent=default_replace_intent,
+                                             return_type=return_type)
         super()._init_properties(property_manager=_pm, uri_pm_path=uri_pm_path, pm_file_type=pm_file_type,
                                  pm_module=pm_module, pm_handler=pm_handler, pm_kwargs=pm_kwargs)
         return cls(property_manager=_pm, intent_model=_intent_model, default_save=default_save,
@@ -129,9 +136,49 @@ class SyntheticBuilder(AbstractComponent):
             self.pm_persist(save)
         return
 
-    def run_synthetic_pipeline(self, size: int, columns: [str, list]=None):
-        """Runs the transition pipeline from source to persist"""
-        result = self.intent_model.run_intent_pipeline(size=size, columns=columns)
+    def run_synthetic_pipeline(self, size: int, columns: [str, list]=None, shards: int=None, seed: int=None,
+                               profile: bool=None, cache: [bool, str]=None):
+        """Runs the transition pipeline from source to persist. If shards are given, the rows are split across a
+        process pool and the shard outcomes concatenated in order. Each shard is run as a chunk of the whole outcome,
+        as with 'run_intent_pipeline' chunk_size, so its seeds are derived from the seed and the shard index and
+        seeded identifiers are unique across shards. The same seed and number of shards gives the same outcome.
+
+        :param size: the size of the outcome data set
+        :param columns: (optional) a single or list of intent_level to run, if list, run in order given
+        :param shards: (optional) the number of processes to split the rows across
+        :param seed: (optional) the seed that each shard seed is derived from. If None then the outcome is random
+        :param profile: (optional) if each intent method run should be profiled (see 'report_pipeline_profile')
+        :param cache: (optional) if True caches the column results in memory, if a directory path caches the column
+                        results as Parquet files in that directory so only changed columns are rerun, which
+                        requires pyarrow or fastparquet. Shards can only share a directory cache
+        """
+        profile = profile if isinstance(profile, bool) else False
+        if not isinstance(shards, int) or shards < 2:
+            result = self.intent_model.run_intent_pipeline(size=size, columns=columns, seed=seed, profile=profile,
+                                                           cache=cache)
+            if profile:
+                self._pipeline_profile = self.intent_model.intent_profile
+        else:
+            # every shard shares the seed so identifiers are taken from the same permutation
+            seed = seed if isinstance(seed, int) else int(np.random.SeedSequence().generate_state(1)[0] >> 2)
+            shard_sizes = [int(size / shards) + (1 if i < size % shards else 0) for i in range(shards)]
+            shard_offsets = np.cumsum([0] + shard_sizes[:-1]).tolist()
+            intent = self.pm.get(self.pm.KEY.intent_key, {})
+            connectors = self.pm.get(self.pm.KEY.connectors_key, {})
+            cache = cache if isinstance(cache, str) else None
+            if isinstance(cache, str):
+                self.intent_model._check_parquet_engine()
+                os.makedirs(cache, exist_ok=True)
+            with ProcessPoolExecutor(max_workers=shards) as executor:
+                futures = [executor.submit(_run_shard, intent=intent, connectors=connectors, size=shard_size,
+                                           columns=columns, seed=seed, shard=shard, offset=offset, profile=profile,
+                                           cache=cache, return_type=self.intent_model.return_type)
+                           for shard, (shard_size, offset) in enumerate(zip(shard_sizes, shard_offsets))
+                           if shard_size > 0]
+                results = [future.result() for future in futures]
+            result = pd.concat([shard for shard, _ in results], axis=0, ignore_index=True)
+            if profile:
+                self._pipeline_profile = [record for _, shard_profile in results for record in shard_profile]
         self.save_synthetic_canonical(canonical=result)
 
     def report_connectors(self, connector_filter: [str, list] = None, stylise: bool = True):
@@ -171,6 +218,25 @@ class SyntheticBuilder(AbstractComponent):
         df.set_index(keys='level', inplace=True)
         return df
 
+    def report_pipeline_profile(self, stylise: bool = True):
+        """ generates a report on the per intent profile of the last synthetic pipeline run with profile set to True.
+        Where a pipeline is run in shards or chunks, the intent profiles are summed with the peak memory being the
+        largest of the runs.
+
+        :param stylise: returns a stylised dataframe with formatting
+        :return: pd.Dataframe
+        """
+        columns = ['column', 'order', 'intent', 'rows', 'wall_time', 'cpu_time', 'peak_memory', 'rows_per_sec']
+        df = pd.DataFrame(data=self._pipeline_profile, columns=columns)
+        df = df.groupby(['column', 'order', 'intent'], sort=False).agg(
+            {'rows': 'sum', 'wall_time': 'sum', 'cpu_time': 'sum', 'peak_memory': 'max'}).reset_index()
+        df['rows_per_sec'] = df['rows'].div(df['wall_time'].where(df['wall_time'] > 0))
+        df = df[columns]
+        if stylise:
+            return Commons.report(df, index_header='column')
+        df.set_index(keys='column', inplace=True)
+        return df
+
     def report_notes(self, catalog: [str, list] = None, labels: [str, list] = None, regex: [str, list] = None,
                      re_ignore_case: bool = False, stylise: bool = True, drop_dates: bool = False):
         """ generates a report on the notes
@@ -211,3 +277,29 @@ class SyntheticBuilder(AbstractComponent):
             df.set_index(keys='column_name', inplace=True)
         return df
 
+
+def _run_shard(intent: dict, connectors: dict, size: int, columns: [str, list], seed: int, shard: int, offset: int,
+               profile: bool, cache: str=None, return_type: str=None):
+    """ runs the intent pipeline for a single shard in its own process from a copy of the intent and connector
+    contract sections. The shard is run as the chunk at its row offset in the whole outcome
+
+    :param intent: the intent section of the contract
+    :param connectors: the connectors section of the contract
+    :param size: the size of the shard
+    :param columns: a single or list of intent_level to run
+    :param seed: the run seed shared by all the shards
+    :param shard: the shard index
+    :param offset: the row offset of the shard in the whole outcome
+    :param profile: if each intent method run should be profiled
+    :param cache: (optional) the directory path of the Parquet column cache
+    :param return_type: (optional) the type the intent methods return, 'list' or 'array'
+    :return: a tuple of the pandas DataFrame and the list of intent profile records
+    """
+    _pm = SyntheticPropertyManager(task_name='synthetic_shard', username='shard')
+    _pm.set(_pm.KEY.intent_key, intent)
+    _pm.set(_pm.KEY.connectors_key, connectors)
+    _intent_model = SyntheticIntentModel(property_manager=_pm, default_save_intent=False, return_type=return_type)
+    _profile = [] if profile else None
+    result = _intent_model._run_intent_canonical(size=size, plan=_intent_model._compile_intent(columns), seed=seed,
+                                                 chunk=shard, offset=offset, profile=_profile, cache=cache)
+    return result, _profile or []
@@ -1,12 +1,20 @@
+import ast
+import hashlib
+import importlib.util
 import inspect
-import random
+import operator
+import os
 import re
 import string
-import warnings
+import threading
+import time
+import tracemalloc
+import types
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from copy import deepcopy
-from typing import Any
-from matplotlib import dates as mdates
-from pandas.tseries.offsets import Week
+from functools import lru_cache
+from typing import Any, Generator
 
 from aistac.intent.abstract_intent import AbstractIntentModel
 from aistac.properties.abstract_properties import AbstractPropertyManager
@@ -19,7 +27,8 @@ __author__ = 'Darryl Oatridge'
 class SyntheticIntentModel(AbstractIntentModel):
 
     def __init__(self, property_manager: AbstractPropertyManager, default_save_intent: bool=None,
-                 default_intent_level: bool=None, order_next_available: bool=None, default_replace_intent: bool=None):
+                 default_intent_level: bool=None, order_next_available: bool=None, default_replace_intent: bool=None,
+                 return_type: str=None):
         """initialisation of the Intent class.
 
         :param property_manager: the property manager class that references the intent contract.
@@ -27,6 +36,9 @@ class SyntheticIntentModel(AbstractIntentModel):
         :param default_intent_level: (optional) the default level intent should be saved at
         :param order_next_available: (optional) if the default behaviour for the order should be next available order
         :param default_replace_intent: (optional) the default replace existing intent behaviour
+        :param return_type: (optional) the type the intent methods return, 'list' or 'array'. default to 'list'
+                        list - a python list of values
+                        array - a numpy array or a pandas nullable extension array with nulls set in place
         """
         default_save_intent = default_save_intent if isinstance(default_save_intent, bool) else True
         default_replace_intent = default_replace_intent if isinstance(default_replace_intent, bool) else True
@@ -38,81 +50,90 @@ class SyntheticIntentModel(AbstractIntentModel):
                          intent_param_exclude=intent_param_exclude, default_intent_level=default_intent_level,
                          default_intent_order=default_intent_order, default_replace_intent=default_replace_intent,
                          intent_type_additions=intent_type_additions)
-
-    def run_intent_pipeline(self, size: int, columns: [str, list]=None, **kwargs) -> pd.DataFrame:
+        # the cache of compiled intent execution plans
+        self._intent_plans = dict()
+        self._intent_plans_lock = threading.Lock()
+        # the per intent profile of the last profiled pipeline run
+        self._intent_profile = []
+        # the in memory cache of column results keyed on the column and chunk
+        self._intent_cache = dict()
+        # the type the intent methods return their values as
+        self._return_type = 'array' if isinstance(return_type, str) and return_type.lower() == 'array' else 'list'
+
+    @property
+    def intent_profile(self) -> list:
+        """returns a list of the per intent profile records of the last pipeline run with profile set to True"""
+        return list(self._intent_profile)
+
+    @property
+    def return_type(self) -> str:
+        """returns the type the intent methods return their values as, 'list' or 'array'"""
+        return self._return_type
+
+    def clear_intent_cache(self):
+        """clears the in memory cache of column results (see 'run_intent_pipeline')"""
+        self._intent_cache = dict()
+
+    def run_intent_pipeline(self, size: int, columns: [str, list]=None, workers: int=None, chunk_size: int=None,
+                            seed: int=None, profile: bool=None, cache: [bool, str]=None,
+                            **kwargs) -> [pd.DataFrame, Generator]:
         """Collectively runs all parameterised intent taken from the property manager against the code base as
         defined by the intent_contract.
 
+        The columns are scheduled from a dependency graph built from the intent contract, so a column is only run
+        once the columns it references are available. Columns that are independent of each other can be run
+        concurrently by setting the number of workers.
+
+        If a chunk_size is given, a generator is returned that yields the outcome as DataFrame chunks of at most
+        chunk_size rows, keeping memory proportional to the chunk rather than the whole outcome. Each chunk is built
+        independently so correlate intent only see the rows of their own chunk, and the chunk index is used to
+        derive the seeds so each chunk is reproducible. As each chunk has its own seeds, uniqueness such as an integer
+        'get_number' with at_most=1 only holds within a chunk. The exception is seeded 'get_identifiers' which share
+        the seed across chunks and skip the identifiers of the chunks before, so are unique across the whole outcome.
+        Only a directory cache can be used with chunk_size as an in-memory cache would hold every chunk.
+
+        If profile is True, the wall time, CPU time, peak traced memory and rows per second of each intent method
+        run are recorded and can be retrieved from 'intent_profile'. When run with workers, the peak memory of
+        concurrently running intent is shared.
+
+        If cache is set, the result of each column is cached against a key of its intent, parameters, seed, size and
+        the keys of the columns it depends on. On the next run, only columns whose key has changed, and the columns
+        that depend on them, are rerun. Columns without a seed, from either the intent or the run seed, are random so
+        are never cached.
+
         :param size: the size of the outcome data set
         :param columns: (optional) a single or list of intent_level to run, if list, run in order given
+        :param workers: (optional) the number of worker threads to run independent columns concurrently. Default 1
+        :param chunk_size: (optional) if set, returns a generator of DataFrame chunks of this size
+        :param seed: (optional) a run seed that the seed of each column intent is derived from
+        :param profile: (optional) if each intent method run should be profiled. Default False
+        :param cache: (optional) if True caches the column results in memory, if a directory path caches the column
+                        results as Parquet files in that directory, which requires pyarrow or fastparquet.
+                        Default no caching
         :param kwargs: additional parameters to pass beyond the contracted parameters
-        :return: a pandas dataframe
+        :return: a pandas dataframe or a generator of pandas dataframe chunks if chunk_size is set
         """
-        df = pd.DataFrame()
+        # size
+        size = size if isinstance(size, int) else 1000
+        profile = profile if isinstance(profile, bool) else False
+        if profile:
+            self._intent_profile = []
+        _profile = self._intent_profile if profile else None
+        cache = cache if isinstance(cache, (bool, str)) and cache else None
+        if isinstance(cache, str):
+            self._check_parquet_engine()
+            os.makedirs(cache, exist_ok=True)
+        if isinstance(chunk_size, int) and chunk_size > 0:
+            if cache is True:
+                raise ValueError(f"The in-memory cache can't be used with a chunk_size as it would hold every chunk, "
+                                 f"pass a directory path to cache the chunks as Parquet files")
+            return self._run_intent_chunks(size=size, chunk_size=chunk_size, columns=columns, workers=workers,
+                                           seed=seed, profile=_profile, cache=cache, **kwargs)
         # test if there is any intent to run
-        if self._pm.has_intent():
-            # size
-            size = size if isinstance(size, int) else 1000
-            # get the list of levels to run
-            if isinstance(columns, (str, list)):
-                column_names = self._pm.list_formatter(columns)
-            else:
-                # put all the intent in order of model, get, correlate, associate
-                _model = []
-                _get = []
-                _correlate = []
-                _associate = []
-                _remove = []
-                for column in self._pm.get_intent().keys():
-                    for order in self._pm.get(self._pm.join(self._pm.KEY.intent_key, column), {}):
-                        for method in self._pm.get(self._pm.join(self._pm.KEY.intent_key, column, order), {}).keys():
-                            if str(method).startswith('model_'):
-                                _model.append(column)
-                            elif str(method).startswith('get_'):
-                                _get.append(column)
-                            elif str(method).startswith('correlate_'):
-                                if column in _get:
-                                    _get.remove(column)
-                                _correlate.append(column)
-                            elif str(method).startswith('associate_'):
-                                if column in _get:
-                                    _get.remove(column)
-                                _associate.append(column)
-                            elif str(method).startswith('remove_'):
-                                if column in _get:
-                                    _get.remove(column)
-                                _remove.append(column)
-                column_names = Commons.unique_list(_model + _get + _correlate + _associate + _remove)
-            for column in column_names:
-                level_key = self._pm.join(self._pm.KEY.intent_key, column)
-                for order in sorted(self._pm.get(level_key, {})):
-                    for method, params in self._pm.get(self._pm.join(level_key, order), {}).items():
-                        if method in self.__dir__():
-                            result = []
-                            params.update(params.pop('kwargs', {}))
-                            _ = params.pop('intent_creator', 'Unknown')
-                            if isinstance(kwargs, dict):
-                                params.update(kwargs)
-                            if str(method).startswith('get_'):
-                                result = eval(f"self.{method}(size=size, save_intent=False, **params)",
-                                              globals(), locals())
-                            elif str(method).startswith('correlate_') or str(method).startswith('associate'):
-                                result = eval(f"self.{method}(canonical=df, save_intent=False, **params)",
-                                              globals(), locals())
-                            elif str(method).startswith('model_'):
-                                result = eval(f"self.{method}(size=size, save_intent=False, **params)",
-                                              globals(), locals())
-                                result = pd.DataFrame(result)
-                                df = pd.concat([df, result], axis=1, sort=False, copy=False)
-                                continue
-                            elif str(method).startswith('remove_'):
-                                df = eval(f"self.{method}(canonical=df, save_intent=False, **params)",
-                                          globals(), locals())
-                                continue
-                            if len(result) != size:
-                                raise IndexError(f"The index size of '{column}' is '{len(result)}', should be {size}")
-                            df[column] = result
-        return df
+        if not self._pm.has_intent():
+            return pd.DataFrame()
+        return self._run_intent_canonical(size=size, plan=self._compile_intent(columns), workers=workers, seed=seed,
+                                          profile=_profile, cache=cache, **kwargs)
 
     def get_number(self, range_value: [int, float]=None, to_value: [int, float]=None, weight_pattern: list=None,
                    offset: int=None, precision: int=None, ordered: str=None, currency: str=None,
@@ -168,7 +189,7 @@ class SyntheticIntentModel(AbstractIntentModel):
         dominant_percent = 0 if not isinstance(dominant_percent, (int, float)) else dominant_percent
         dominant_percent = dominant_percent / 100 if 1 < dominant_percent <= 100 else dominant_percent
         _seed = self._seed() if seed is None else seed
-        _limit = 10000
+        generator = self._generator(_seed)
         precision = 3 if not isinstance(precision, int) else precision
         if precision == 0:
             range_value = int(round(range_value, 0))
@@ -183,125 +204,64 @@ class SyntheticIntentModel(AbstractIntentModel):
             if sample_count > 0:
                 if isinstance(dominant_values, list):
                     dominant_list = self.get_category(selection=dominant_values, weight_pattern=dominance_weighting,
-                                                      size=sample_count, bounded_weighting=True, save_intent=False)
+                                                      size=sample_count, bounded_weighting=True, seed=_seed,
+                                                      save_intent=False)
                 else:
                     dominant_list = [dominant_values] * sample_count
             size -= sample_count
-        if weight_pattern is not None:
-            counter = [0] * len(weight_pattern)
-            if bounded_weighting:
-                unit = size/sum(weight_pattern)
-                for i in range(len(weight_pattern)):
-                    counter[i] = int(round(weight_pattern[i] * unit, 0))
-                    if 0 < at_most < counter[i]:
-                        counter[i] = at_most
-                    if counter[i] == 0 and weight_pattern[i] > 0:
-                        if counter[self._weighted_choice(weight_pattern)] == i:
-                            counter[i] = 1
-            else:
-                for _ in range(size):
-                    counter[self._weighted_choice(weight_pattern)] += 1
-                for i in range(len(counter)):
-                    if 0 < at_most < counter[i]:
-                        counter[i] = at_most
-            while sum(counter) != size:
-                if at_most > 0:
-                    for index in range(len(counter)):
-                        if counter[index] >= at_most:
-                            counter[index] = at_most
-                            weight_pattern[index] = 0
-                if sum(counter) < size:
-                    counter[self._weighted_choice(weight_pattern)] += 1
-                else:
-                    weight_idx = self._weighted_choice(weight_pattern)
-                    if counter[weight_idx] > 0:
-                        counter[weight_idx] -= 1
-
-        else:
-            counter = [size]
-        _seed = self._next_seed(_seed, seed)
-        rtn_list = []
+        bins = len(weight_pattern) if weight_pattern is not None else 1
         if is_int:
-            value_bins = []
-            ref = range_value
-            counter_len = len(counter)
             select_len = to_value - range_value
-            for index in range(1, counter_len):
-                position = int(round(select_len / counter_len * index, 1)) + range_value
-                value_bins.append((ref, position))
-                ref = position
-            value_bins.append((ref, to_value))
-            for index in range(counter_len):
-                low, high = value_bins[index]
-                # check our range is not also the dominants
-                if high - low <= 1:
-                    rtn_list += [low] * counter[index]
-                elif at_most == 1:
-                    multiplier = np.random.randint(1000, 50000)
-                    num = (high - low) if (high - low - counter[index]) < 100000 else counter[index] + multiplier
-                    num_choice = np.linspace(low, high, num=num, dtype=int, endpoint=False)
-                    rtn_list = list(np.random.choice(num_choice, size=counter[index], replace=False))
-                elif at_most > 1:
-                    section_size = int(counter[index]/at_most) if size % at_most == 0 else int(counter[index]/at_most)+1
-                    for _ in range(at_most):
-                        multiplier = np.random.randint(1000, 50000)
-                        num = (high - low) if (high - low - counter[index]) < 100000 else counter[index] + multiplier
-                        num_choice = np.linspace(low, high, num=num, dtype=int, endpoint=False)
-                        rtn_list += list(np.random.choice(num_choice, size=section_size, replace=False))
-                    rtn_list = rtn_list[:counter[index]]
-                    np.random.shuffle(rtn_list)
-                else:
-                    _remaining = counter[index]
-                    while _remaining > 0:
-                        _size = _limit if _remaining > _limit else _remaining
-                        choice = list(np.random.randint(low=low, high=high, size=_size))
-                        choice = [i for i in choice if i not in Commons.list_formatter(dominant_values)]
-                        rtn_list += choice
-                        _remaining -= len(choice)
+            edges = [range_value] + [int(round(select_len / bins * index, 1)) + range_value
+                                     for index in range(1, bins)] + [to_value]
         else:
-            value_bins = pd.interval_range(start=range_value, end=to_value, periods=len(counter), closed='both')
-            for index in range(len(counter)):
-                low = value_bins[index].left
-                high = value_bins[index].right
-                if low >= high:
-                    rtn_list += [low] * counter[index]
-                elif at_most == 1:
-                    multiplier = np.random.randint(1000, 50000)
-                    num_choice = np.linspace(low, high, num=counter[index]+multiplier, dtype=float, endpoint=False)
-                    rtn_list = list(np.random.choice(num_choice, size=counter[index], replace=False))
-                elif at_most > 1:
-                    section_size = int(counter[index] / at_most) if size % at_most == 0 else int(
-                        counter[index] / at_most) + 1
-                    for _ in range(at_most):
-                        multiplier = np.random.randint(1000, 50000)
-                        num_choice = np.linspace(low, high, num=counter[index]+multiplier, dtype=float, endpoint=False)
-                        rtn_list += list(np.random.choice(num_choice, size=section_size,  replace=False))
-                    rtn_list = rtn_list[:counter[index]]
-                    np.random.shuffle(rtn_list)
-                else:
-                    _remaining = counter[index]
-                    while _remaining > 0:
-                        _size = _limit if _remaining > _limit else _remaining
-                        choice = np.round((np.random.random(size=_size)*(high-low)+low), precision).tolist()
-                        choice = [i for i in choice if i not in Commons.list_formatter(dominant_values) + [high]]
-                        rtn_list += choice
-                        _remaining -= len(choice)
-        if isinstance(currency, str):
-            rtn_list = ['{}{:0,.{}f}'.format(currency, value, precision) for value in rtn_list]
+            edges = np.linspace(range_value, to_value, num=bins + 1).tolist()
+        exclude = Commons.list_formatter(dominant_values)
+        independent = weight_pattern is not None and not bounded_weighting and at_most == 0 and len(exclude) == 0
+        if independent:
+            # each value is an independent draw so the bins are chosen per value from the alias table
+            values = self._alias_number_bins(np.asarray(edges), weight_pattern, size=size, is_int=is_int,
+                                             precision=precision, generator=generator)
+        elif weight_pattern is not None:
+            # with at_most, an integer bin can hold at most at_most of each of its values
+            capacity = None
+            if is_int and at_most > 0:
+                capacity = np.maximum(np.diff(edges), 1) * at_most
+            counter = self._weighted_counts(weight_pattern, size=size, capacity=capacity,
+                                            bounded_weighting=bounded_weighting, generator=generator)
+        else:
+            counter = np.array([size])
+        if not independent:
+            values = [self._number_bin(low=edges[index], high=edges[index + 1], count=int(counter[index]),
+                                       at_most=at_most, exclude=exclude, is_int=is_int, precision=precision,
+                                       generator=generator) for index in range(counter.size)]
+            values = np.concatenate(values) if len(values) > 0 else np.array([], dtype=int if is_int else float)
         if offset != 1:
-            rtn_list = [value*offset for value in rtn_list]
+            values = values * offset
+        if isinstance(currency, str):
+            rtn_list = ['{}{:0,.{}f}'.format(currency, value, precision) for value in values]
+            # add in the dominant values
+            rtn_list += dominant_list
+            if isinstance(ordered, str) and ordered.lower() in ['asc', 'des']:
+                rtn_list.sort(reverse=True if ordered.lower() == 'asc' else False)
+            else:
+                generator.shuffle(rtn_list)
+            return self._set_quantity(rtn_list, quantity=quantity, generator=generator)
         # add in the dominant values
-        rtn_list += dominant_list
+        if len(dominant_list) > 0:
+            values = np.concatenate([values, dominant_list])
         if isinstance(ordered, str) and ordered.lower() in ['asc', 'des']:
-            rtn_list.sort(reverse=True if ordered.lower() == 'asc' else False)
-        else:
-            np.random.shuffle(rtn_list)
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+            values = np.sort(values)
+            if ordered.lower() == 'asc':
+                values = values[::-1]
+        elif not independent:
+            generator.shuffle(values)
+        return self._set_quantity(values, quantity=quantity, generator=generator)
 
     def get_category(self, selection: list, weight_pattern: list=None, quantity: float=None, size: int=None,
-                     bounded_weighting: bool=None, at_most: int=None, seed: int=None, save_intent: bool=None,
-                     column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
-                     remove_duplicates: bool=None) -> list:
+                     bounded_weighting: bool=None, at_most: int=None, seed: int=None, categorical: bool=None,
+                     save_intent: bool=None, column_name: [int, str]=None, intent_order: int=None,
+                     replace_intent: bool=None, remove_duplicates: bool=None) -> list:
         """ returns a category from a list. Of particular not is the at_least parameter that allows you to
         control the number of times a selection can be chosen.
 
@@ -312,6 +272,7 @@ class SyntheticIntentModel(AbstractIntentModel):
         :param at_most: the most times a selection should be chosen
         :param bounded_weighting: if the weighting pattern should have a soft or hard boundary (default False)
         :param seed: a seed value for the random function: default to None
+        :param categorical: (optional) if the return is a pandas Categorical built from the selection codes
         :param save_intent (optional) if the intent contract should be saved to the property manager
         :param column_name: (optional) the column name that groups intent to create a column
         :param intent_order: (optional) the order in which each intent should run.
@@ -330,14 +291,25 @@ class SyntheticIntentModel(AbstractIntentModel):
                                    remove_duplicates=remove_duplicates, save_intent=save_intent)
         # Code block for intent
         if not isinstance(selection, list) or len(selection) == 0:
-            return [None]*size
+            return self._set_quantity([None]*size, quantity=1)
         bounded_weighting = bounded_weighting if isinstance(bounded_weighting, bool) else False
+        categorical = categorical if isinstance(categorical, bool) else False
         _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
         quantity = self._quantity(quantity)
         select_index = self.get_number(len(selection), weight_pattern=weight_pattern, at_most=at_most, size=size,
-                                       bounded_weighting=bounded_weighting, quantity=1, seed=seed, save_intent=False)
-        rtn_list = [selection[i] for i in select_index]
-        return list(self._set_quantity(rtn_list, quantity=quantity, seed=_seed))
+                                       bounded_weighting=bounded_weighting, quantity=1, seed=_seed, save_intent=False)
+        # an object array filled by element so sequence selections such as tuples are kept whole
+        choices = np.empty(len(selection), dtype=object)
+        for index, item in enumerate(selection):
+            choices[index] = item
+        if categorical:
+            # the selection index maps through the codes of the unique selection so the values are never built
+            (codes, categories) = pd.factorize(choices)
+            values = pd.Categorical.from_codes(codes[np.asarray(select_index, dtype=int)], categories=categories)
+            return self._set_quantity(values, quantity=quantity, generator=generator)
+        values = choices[np.asarray(select_index, dtype=int)]
+        return self._set_quantity(values, quantity=quantity, generator=generator)
 
     def get_datetime(self, start: Any, until: Any, weight_pattern: list=None, at_most: int=None, ordered: str=None,
                      date_format: str=None, as_num: bool=None, ignore_time: bool=None, size: int=None,
@@ -359,7 +331,8 @@ class SyntheticIntentModel(AbstractIntentModel):
         :param ordered: order the data ascending 'asc' or descending 'dec', values accepted 'asc' or 'des'
         :param ignore_time: ignore time elements and only select from Year, Month, Day elements. Default is False
         :param date_format: the string format of the date to be returned. if not set then pd.Timestamp returned
-        :param as_num: returns a list of Matplotlib date values as a float. Default is False
+        :param as_num: returns the dates as the number of days since the epoch, the Matplotlib date value, as a
+                        float, or as an int if ignore_time. Default is False
         :param size: the size of the sample to return. Default to 1
         :param seed: a seed value for the random function: default to None
         :param year_first: specifies if to parse with the year first
@@ -393,27 +366,25 @@ class SyntheticIntentModel(AbstractIntentModel):
         quantity = self._quantity(quantity)
         size = 1 if size is None else size
         _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
         if isinstance(start, int):
             start = (pd.Timestamp.now() + pd.Timedelta(days=start))
         if isinstance(until, int):
             until = (pd.Timestamp.now() + pd.Timedelta(days=until))
-        _dt_start = self._convert_date2value(start, day_first=day_first, year_first=year_first)[0]
-        _dt_until = self._convert_date2value(until, day_first=day_first, year_first=year_first)[0]
-        precision = 15
-        if ignore_time:
-            _dt_start = int(_dt_start)
-            _dt_until = int(_dt_until)
-            precision = 0
-        rtn_list = self.get_number(range_value=_dt_start, to_value=_dt_until, weight_pattern=weight_pattern,
-                                   at_most=at_most, ordered=ordered, precision=precision, size=size, seed=seed,
-                                   save_intent=False)
-        if not as_num:
-            rtn_list = mdates.num2date(rtn_list)
-            if isinstance(date_format, str):
-                rtn_list = pd.Series(rtn_list).dt.strftime(date_format).tolist()
-            else:
-                rtn_list = pd.Series(rtn_list).dt.tz_convert(None).to_list()
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+        # the dates are chosen as int64 nanoseconds since the epoch, or whole days if the time is ignored
+        unit_ns = pd.Timedelta(days=1).value if ignore_time else 1
+        _dt_start = int(self._convert_date2value(start, day_first=day_first, year_first=year_first)[0] // unit_ns)
+        _dt_until = int(self._convert_date2value(until, day_first=day_first, year_first=year_first)[0] // unit_ns)
+        values = np.asarray(self.get_number(range_value=_dt_start, to_value=_dt_until, weight_pattern=weight_pattern,
+                                            at_most=at_most, ordered=ordered, precision=0, size=size, seed=_seed,
+                                            save_intent=False), dtype=np.int64)
+        if as_num:
+            rtn_values = values if ignore_time else values / pd.Timedelta(days=1).value
+        elif isinstance(date_format, str):
+            rtn_values = pd.Series((values * unit_ns).view('M8[ns]')).dt.strftime(date_format)
+        else:
+            rtn_values = (values * unit_ns).view('M8[ns]')
+        return self._set_quantity(rtn_values, quantity=quantity, generator=generator)
 
     def get_datetime_pattern(self, start: Any, until: Any, default: Any=None, ordered: bool=None,
                              date_pattern: list=None, year_pattern: list=None, month_pattern: list=None,
@@ -472,6 +443,7 @@ class SyntheticIntentModel(AbstractIntentModel):
         quantity = self._quantity(quantity)
         size = 1 if size is None else size
         _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
         _dt_start = pd.to_datetime(start, errors='coerce', infer_datetime_format=True,
                                    dayfirst=day_first, yearfirst=year_first)
         _dt_until = pd.to_datetime(until, errors='coerce', infer_datetime_format=True,
@@ -481,116 +453,82 @@ class SyntheticIntentModel(AbstractIntentModel):
         if _dt_start is pd.NaT or _dt_until is pd.NaT:
             raise ValueError("The start or until parameters cannot be converted to a timestamp")
 
-        # ### Apply the patterns if any ###
-        rtn_dates = []
-        for _ in range(size):
-            _seed = self._next_seed(_seed, seed)
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", message='Discarding nonzero nanoseconds in conversion')
-                _min_date = (pd.Timestamp.min + pd.DateOffset(years=1)).replace(month=1, day=1, hour=0, minute=0,
-                                                                                second=0, microsecond=0, nanosecond=0)
-                _max_date = (pd.Timestamp.max + pd.DateOffset(years=-1)).replace(month=12, day=31, hour=23, minute=59,
-                                                                                 second=59, microsecond=0, nanosecond=0)
-                # reset the starting base
-            _dt_default = _dt_base
-            if not isinstance(_dt_default, pd.Timestamp):
-                _dt_default = np.random.random() * (_dt_until - _dt_start) + pd.to_timedelta(_dt_start)
-            # ### date ###
-            if date_pattern is not None:
-                _dp_start = self._convert_date2value(_dt_start)[0]
-                _dp_until = self._convert_date2value(_dt_until)[0]
-                value = self.get_number(_dp_start, _dp_until, weight_pattern=date_pattern, seed=_seed,
-                                        save_intent=False)
-                _dt_default = self._convert_value2date(value)[0]
-            # ### years ###
-            rand_year = _dt_default.year
-            if year_pattern is not None:
-                rand_select = self._date_choice(_dt_start, _dt_until, year_pattern, seed=_seed)
-                if rand_select is pd.NaT:
-                    rtn_dates.append(rand_select)
-                    continue
-                rand_year = rand_select.year
-            _max_date = _max_date.replace(year=rand_year)
-            _min_date = _min_date.replace(year=rand_year)
-            _dt_default = _dt_default.replace(year=rand_year)
-            # ### months ###
-            rand_month = _dt_default.month
-            rand_day = _dt_default.day
-            if month_pattern is not None:
-                month_start = _dt_start if _dt_start.year == _min_date.year else _min_date
-                month_end = _dt_until if _dt_until.year == _max_date.year else _max_date
-                rand_select = self._date_choice(month_start, month_end, month_pattern, limits='month', seed=_seed)
-                if rand_select is pd.NaT:
-                    rtn_dates.append(rand_select)
-                    continue
-                rand_month = rand_select.month
-                rand_day = _dt_default.day if _dt_default.day <= rand_select.daysinmonth else rand_select.daysinmonth
-            _max_date = _max_date.replace(month=rand_month, day=rand_day)
-            _min_date = _min_date.replace(month=rand_month, day=rand_day)
-            _dt_default = _dt_default.replace(month=rand_month, day=rand_day)
-            # ### weekday ###
-            if weekday_pattern is not None:
-                if not len(weekday_pattern) == 7:
-                    raise ValueError("The weekday_pattern mut be a list of size 7 with index 0 as Monday")
-                _weekday = self._weighted_choice(weekday_pattern, seed=_seed)
-                if _weekday != _min_date.dayofweek:
-                    if _dt_start <= (_dt_default + Week(weekday=_weekday)) <= _dt_until:
-                        rand_day = (_dt_default + Week(weekday=_weekday)).day
-                        rand_month = (_dt_default + Week(weekday=_weekday)).month
-                    elif _dt_start <= (_dt_default - Week(weekday=_weekday)) <= _dt_until:
-                        rand_day = (_dt_default - Week(weekday=_weekday)).day
-                        rand_month = (_dt_default - Week(weekday=_weekday)).month
-                    else:
-                        rtn_dates.append(pd.NaT)
-                        continue
-            _max_date = _max_date.replace(month=rand_month, day=rand_day)
-            _min_date = _min_date.replace(month=rand_month, day=rand_day)
-            _dt_default = _dt_default.replace(month=rand_month, day=rand_day)
-            # ### hour ###
-            rand_hour = _dt_default.hour
-            if hour_pattern is not None:
-                hour_start = _dt_start if _min_date.strftime('%d%m%Y') == _dt_start.strftime('%d%m%Y') else _min_date
-                hour_end = _dt_until if _max_date.strftime('%d%m%Y') == _dt_until.strftime('%d%m%Y') else _max_date
-                rand_select = self._date_choice(hour_start, hour_end, hour_pattern, limits='hour', seed=seed)
-                if rand_select is pd.NaT:
-                    rtn_dates.append(rand_select)
-                    continue
-                rand_hour = rand_select.hour
-            _max_date = _max_date.replace(hour=rand_hour)
-            _min_date = _min_date.replace(hour=rand_hour)
-            _dt_default = _dt_default.replace(hour=rand_hour)
-            # ### minutes ###
-            rand_minute = _dt_default.minute
-            if minute_pattern is not None:
-                minute_start = _dt_start \
-                    if _min_date.strftime('%d%m%Y%H') == _dt_start.strftime('%d%m%Y%H') else _min_date
-                minute_end = _dt_until \
-                    if _max_date.strftime('%d%m%Y%H') == _dt_until.strftime('%d%m%Y%H') else _max_date
-                rand_select = self._date_choice(minute_start, minute_end, minute_pattern, seed=seed)
-                if rand_select is pd.NaT:
-                    rtn_dates.append(rand_select)
-                    continue
-                rand_minute = rand_select.minute
-            _max_date = _max_date.replace(minute=rand_minute)
-            _min_date = _min_date.replace(minute=rand_minute)
-            _dt_default = _dt_default.replace(minute=rand_minute)
-            # ### get the date ###
-            _dt_default = _dt_default.replace(second=np.random.randint(60))
-            if isinstance(_dt_default, pd.Timestamp):
-                _dt_default = _dt_default.tz_localize(None)
-            rtn_dates.append(_dt_default)
+        _dt_start = _dt_start.tz_localize(None) if _dt_start.tzinfo is not None else _dt_start
+        _dt_until = _dt_until.tz_localize(None) if _dt_until.tzinfo is not None else _dt_until
+        start_ns, until_ns = _dt_start.value, _dt_until.value
+        # the patterns are applied to all the dates at once as int64 nanoseconds, with valid masking the dates a
+        # pattern could not be applied to, which are returned as NaT
+        valid = np.ones(size, dtype=bool)
+        if isinstance(_dt_base, pd.Timestamp):
+            _dt_base = _dt_base.tz_localize(None) if _dt_base.tzinfo is not None else _dt_base
+            values = np.full(size, _dt_base.value, dtype=np.int64)
+        else:
+            values = start_ns + (generator.random(size) * (until_ns - start_ns)).astype(np.int64)
+        # ### date ###
+        if date_pattern is not None:
+            values = np.asarray(self.get_number(start_ns, until_ns, weight_pattern=date_pattern, size=size,
+                                                seed=int(generator.integers(2**30)), save_intent=False),
+                                dtype=np.int64)
+        parts = self._date_parts(values) if year_pattern is not None or month_pattern is not None else None
+        # ### years ###
+        if year_pattern is not None:
+            choice = self._date_choice(_dt_start, _dt_until, year_pattern, size=size, generator=generator)
+            valid &= ~np.isnat(choice)
+            parts['year'] = np.where(valid, choice.astype('M8[Y]').astype(np.int64) + 1970, parts['year'])
+        # ### months ###
+        if month_pattern is not None:
+            for year in np.unique(parts['year'][valid]):
+                rows = valid & (parts['year'] == year)
+                month_start = _dt_start if _dt_start.year == year else pd.Timestamp(year=year, month=1, day=1)
+                month_end = _dt_until if _dt_until.year == year else pd.Timestamp(year=year, month=12, day=31,
+                                                                                 hour=23, minute=59, second=59)
+                choice = self._date_choice(month_start, month_end, month_pattern, limits='month',
+                                           size=int(rows.sum()), generator=generator)
+                valid[rows] &= ~np.isnat(choice)
+                parts['month'][rows] = np.where(np.isnat(choice), parts['month'][rows],
+                                                choice.astype('M8[M]').astype(np.int64) % 12 + 1)
+        if parts is not None:
+            values = self._date_compose(parts)
+        # ### weekday ###
+        if weekday_pattern is not None:
+            if not len(weekday_pattern) == 7:
+                raise ValueError("The weekday_pattern mut be a list of size 7 with index 0 as Monday")
+            day_ns = pd.Timedelta(days=1).value
+            weekday = self._weighted_choice(weekday_pattern, size=size, generator=generator)
+            # the epoch was a Thursday, index 3 with index 0 as Monday
+            dayofweek = (values // day_ns + 3) % 7
+            forward = values + ((weekday - dayofweek) % 7) * day_ns
+            backward = values - ((dayofweek - weekday) % 7) * day_ns
+            change = weekday != dayofweek
+            in_forward = (forward >= start_ns) & (forward <= until_ns)
+            in_backward = (backward >= start_ns) & (backward <= until_ns)
+            values = np.where(change & in_forward, forward, np.where(change & in_backward, backward, values))
+            valid &= ~change | in_forward | in_backward
+        # the time units are fixed lengths so are replaced by adding the difference
+        hour_ns, minute_ns, second_ns = [pd.Timedelta(1, unit=unit).value for unit in ['h', 'm', 's']]
+        # ### hour ###
+        if hour_pattern is not None:
+            choice = self._date_window_choice(values, valid=valid, start=_dt_start, until=_dt_until, unit='D',
+                                              weight_pattern=hour_pattern, limits='hour', generator=generator)
+            valid &= ~np.isnat(choice)
+            change = choice.view(np.int64) // hour_ns % 24 - values // hour_ns % 24
+            values = np.where(valid, values + change * hour_ns, values)
+        # ### minutes ###
+        if minute_pattern is not None:
+            choice = self._date_window_choice(values, valid=valid, start=_dt_start, until=_dt_until, unit='H',
+                                              weight_pattern=minute_pattern, generator=generator)
+            valid &= ~np.isnat(choice)
+            change = choice.view(np.int64) // minute_ns % 60 - values // minute_ns % 60
+            values = np.where(valid, values + change * minute_ns, values)
+        # ### get the date ###
+        values = values + (generator.integers(60, size=size) - values // second_ns % 60) * second_ns
+        rtn_dates = values.view('M8[ns]')
+        rtn_dates[~valid] = np.datetime64('NaT')
         if ordered:
-            rtn_dates = sorted(rtn_dates)
-        rtn_list = []
+            rtn_dates = np.sort(rtn_dates)
         if isinstance(date_format, str):
-            for d in rtn_dates:
-                if isinstance(d, pd.Timestamp):
-                    rtn_list.append(d.strftime(date_format))
-                else:
-                    rtn_list.append(str(d))
-        else:
-            rtn_list = rtn_dates
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+            rtn_dates = pd.Series(rtn_dates).dt.strftime(date_format).fillna(str(pd.NaT))
+        return self._set_quantity(rtn_dates, quantity=quantity, generator=generator)
 
     def get_intervals(self, intervals: list, weight_pattern: list=None, precision: int=None, currency: str=None,
                       dominant_values: [float, list]=None, dominant_percent: float=None, dominance_weighting: list=None,
@@ -631,12 +569,13 @@ class SyntheticIntentModel(AbstractIntentModel):
         if not isinstance(precision, int):
             precision = 0 if all(isinstance(v[0], int) and isinstance(v[1], int) for v in intervals) else 3
         _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
         if not all(isinstance(value, tuple) for value in intervals):
             raise ValueError("The intervals list must be a list of tuples")
         interval_list = self.get_category(selection=intervals, weight_pattern=weight_pattern, size=size, seed=_seed,
                                           save_intent=False)
         interval_counts = pd.Series(interval_list).value_counts()
-        rtn_list = []
+        sections = []
         for index in interval_counts.index:
             size = interval_counts[index]
             if size == 0:
@@ -660,13 +599,14 @@ class SyntheticIntentModel(AbstractIntentModel):
                 lower += margin
             elif str.lower(closed) == 'both':
                 upper += margin
-            rtn_list = rtn_list + self.get_number(lower, upper, precision=precision, currency=currency, size=size,
-                                                  dominant_values=dominant_values,
-                                                  dominance_weighting=dominance_weighting,
-                                                  dominant_percent=dominant_percent, seed=_seed, save_intent=False)
-        np.random.seed(_seed)
-        np.random.shuffle(rtn_list)
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+            sections.append(np.asarray(self.get_number(lower, upper, precision=precision, currency=currency,
+                                                       size=size, dominant_values=dominant_values,
+                                                       dominance_weighting=dominance_weighting,
+                                                       dominant_percent=dominant_percent, seed=_seed,
+                                                       save_intent=False)))
+        values = np.concatenate(sections) if len(sections) > 0 else np.array([])
+        generator.shuffle(values)
+        return self._set_quantity(values, quantity=quantity, generator=generator)
 
     def get_distribution(self, method: str=None, offset: float=None, precision: int=None, size: int=None,
                          quantity: float=None, seed: int=None, save_intent: bool=None, column_name: [int, str]=None,
@@ -674,7 +614,7 @@ class SyntheticIntentModel(AbstractIntentModel):
                          **kwargs) -> list:
         """returns a number based the distribution type. Supports Normal, Beta and
 
-        :param method: any method name under np.random. Default is 'normal'
+        :param method: any method name of a numpy random Generator. Default is 'normal'
         :param offset: a value to offset the number by. n * offset
         :param precision: the precision of the returned number
         :param size: the size of the sample
@@ -702,15 +642,18 @@ class SyntheticIntentModel(AbstractIntentModel):
         quantity = self._quantity(quantity)
         size = 1 if size is None else size
         _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
 
         method = 'normal' if method is None else method
+        # legacy np.random method names that are named differently on a Generator
+        method = {'randint': 'integers', 'random_sample': 'random', 'ranf': 'random', 'sample': 'random',
+                  'random_integers': 'integers'}.get(method, method)
+        if not hasattr(generator, method):
+            raise ValueError(f"The method '{method}' is not a recognised numpy random Generator method")
         precision = 3 if precision is None else precision
-        func = "np.random.{}(**{})".format(method, kwargs)
-        rtn_list = []
-        for _ in range(size):
-            _seed = self._next_seed(_seed, seed)
-            rtn_list.append(round(eval(func) * offset, precision))
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+        values = getattr(generator, method)(size=size, **kwargs)
+        values = np.round(np.asarray(values) * offset, precision)
+        return self._set_quantity(values, quantity=quantity, generator=generator)
 
     def get_string_pattern(self, pattern: str, choices: dict=None, quantity: [float, int]=None, size: int=None,
                            choice_only: bool=None, seed: int=None, save_intent: bool=None, column_name: [int, str]=None,
@@ -757,36 +700,39 @@ class SyntheticIntentModel(AbstractIntentModel):
         size = 1 if size is None else size
         _seed = self._seed() if seed is None else seed
         if choices is None or not isinstance(choices, dict):
-            choices = {'c': list(string.ascii_letters),
-                       'd': list(string.digits),
-                       'l': list(string.ascii_lowercase),
-                       'U': list(string.ascii_uppercase),
-                       'p': list(string.punctuation),
-                       's': [' '],
-                       }
-            choices.update({p: [p] for p in list(string.punctuation)})
+            choices = None
         else:
             for k, v in choices.items():
                 if not isinstance(v, list):
                     raise ValueError(
                         "The key '{}' must contain a 'list' of replacements opotions. '{}' found".format(k, type(v)))
-
-        rtn_list = []
-        _seed = self._next_seed(_seed, seed)
-        for c in list(pattern):
-            if c in choices.keys():
-                result = np.random.choice(choices[c], size=size)
-            elif not choice_only:
-                result = [c]*size
-            else:
-                continue
-            rtn_list = [i + j for i, j in zip(rtn_list, result)] if len(rtn_list) > 0 else result
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+            choices = tuple((k, tuple(str(x) for x in v)) for k, v in choices.items())
+        generator = self._generator(_seed)
+        (plan, fixed_width) = self._string_pattern_plan(pattern, choices=choices, choice_only=choice_only)
+        if len(plan) == 0:
+            return self._set_quantity([''] * size, quantity=quantity, generator=generator)
+        if fixed_width:
+            # one unicode code point per position, sampled into a buffer that is viewed as fixed width strings
+            buffer = np.empty((size, len(plan)), dtype=np.uint32)
+            for position, codes in enumerate(plan):
+                if codes.size == 1:
+                    buffer[:, position] = codes[0]
+                else:
+                    buffer[:, position] = codes[generator.integers(codes.size, size=size,
+                                                                   dtype=np.uint8 if codes.size <= 256 else np.int64)]
+            rtn_values = buffer.view(f"U{len(plan)}").ravel()
+        else:
+            rtn_values = None
+            for options in plan:
+                result = options[generator.integers(options.size, size=size)] if options.size > 1 else \
+                    np.full(size, options[0])
+                rtn_values = result if rtn_values is None else np.char.add(rtn_values, result)
+        return self._set_quantity(rtn_values, quantity=quantity, generator=generator)
 
     def get_from(self, connector_name: str, column_header: str, weight_pattern: list=None, selection_size: int=None,
                  sample_size: int=None, size: int=None, at_most: bool=None, shuffled: bool=None, quantity: float=None,
-                 seed: int=None, save_intent: bool=None, column_name: [int, str]=None, intent_order: int=None,
-                 replace_intent: bool=None, remove_duplicates: bool=None) -> list:
+                 seed: int=None, categorical: bool=None, save_intent: bool=None, column_name: [int, str]=None,
+                 intent_order: int=None, replace_intent: bool=None, remove_duplicates: bool=None) -> list:
         """ returns a random list of values where the selection of those values is taken a connector dataset.
 
         :param connector_name: a connector_name for a connector to a data source
@@ -799,6 +745,7 @@ class SyntheticIntentModel(AbstractIntentModel):
         :param quantity: (optional) a number between 0 and 1 representing the percentage quantity of the data
         :param size: (optional) size of the return. default to 1
         :param seed: (optional) a seed value for the random function: default to None
+        :param categorical: (optional) if the return is a pandas Categorical built from the selection codes
         :param save_intent (optional) if the intent contract should be saved to the property manager
         :param column_name: (optional) the column name that groups intent to create a column
         :param intent_order: (optional) the order in which each intent should run.
@@ -829,11 +776,11 @@ class SyntheticIntentModel(AbstractIntentModel):
             raise ValueError(f"The column '{column_header}' not found in the data from connector '{connector_name}'")
         _values = canonical[column_header].iloc[:sample_size]
         if isinstance(selection_size, float) and shuffled:
-            _values = _values.sample(frac=1).reset_index(drop=True)
+            _values = _values.sample(frac=1, random_state=self._generator(_seed)).reset_index(drop=True)
         if isinstance(selection_size, int) and 0 < selection_size < _values.size:
             _values = _values.iloc[:selection_size]
         return self.get_category(selection=_values.tolist(), weight_pattern=weight_pattern, quantity=quantity,
-                                 size=size, at_most=at_most, seed=_seed, save_intent=False)
+                                 size=size, at_most=at_most, seed=_seed, categorical=categorical, save_intent=False)
 
     def get_profile_middle_initials(self, size: int=None, seed: int=None, save_intent: bool=None,
                                     column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
@@ -847,30 +794,40 @@ class SyntheticIntentModel(AbstractIntentModel):
         middle = self.get_category(selection=list("ABCDEFGHIJKLMNOPRSTW") + ['  '] * 4, size=int(size * 0.95),
                                    seed=seed, save_intent=False)
         choices = {'U': list("ABCDEFGHIJKLMNOPRSTW")}
-        middle += self.get_string_pattern(pattern="U U", choices=choices, choice_only=False, size=size - len(middle),
-                                          seed=seed, save_intent=False)
-        return middle
-
-    def get_profile_surname(self, size: int=None, seed: int=None, save_intent: bool=None, column_name: [int, str]=None,
-                            intent_order: int=None, replace_intent: bool=None, remove_duplicates: bool=None):
-        """ returns a surnames """
+        middle = pd.concat([pd.Series(middle, dtype=object),
+                            pd.Series(self.get_string_pattern(pattern="U U", choices=choices, choice_only=False,
+                                                              size=size - len(middle), seed=seed, save_intent=False),
+                                      dtype=object)], ignore_index=True)
+        return self._set_quantity(middle, quantity=1)
+
+    def get_profile_surname(self, size: int=None, seed: int=None, categorical: bool=None, save_intent: bool=None,
+                            column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
+                            remove_duplicates: bool=None):
+        """ returns a surnames, as a pandas Categorical if categorical """
         self._set_intend_signature(self._intent_builder(method=inspect.currentframe().f_code.co_name, params=locals()),
                                    column_name=column_name, intent_order=intent_order, replace_intent=replace_intent,
                                    remove_duplicates=remove_duplicates, save_intent=save_intent)
         # Code block for intent
         size = 1 if size is None else size
-        return self.get_category(selection=ProfileSample.surnames(), size=size, seed=seed, save_intent=False)
+        return self.get_category(selection=ProfileSample.surnames(), size=size, seed=seed, categorical=categorical,
+                                 save_intent=False)
 
     def get_identifiers(self, from_value: int, to_value: int=None, size: int=None, prefix: str=None, suffix: str=None,
-                        quantity: float=None, seed: int=None, save_intent: bool=None, column_name: [int, str]=None,
-                        intent_order: int=None, replace_intent: bool=None, remove_duplicates: bool=None) -> list:
+                        skip: int=None, quantity: float=None, seed: int=None, save_intent: bool=None,
+                        column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
+                        remove_duplicates: bool=None) -> list:
         """ returns a list of unique identifiers randomly selected between the from_value and to_value
 
+        The identifiers are taken in order from a seeded random permutation of the range, so memory is proportional
+        to the size rather than the range. Identifiers can be streamed in chunks, without repeats, by calling with the
+        same seed and skipping the identifiers of the chunks before.
+
         :param from_value: range from_value to_value if to_value is used else from 0 to from_value if to_value is None
         :param to_value: optional, (signed) integer to end from.
         :param size: the size of the sample. Must be smaller than the range
         :param prefix: a prefix to the number . Default to nothing
         :param suffix: a suffix to the number. default to nothing
+        :param skip: (optional) the number of identifiers in the seeded permutation to skip. Default to 0
         :param quantity: a number between 0 and 1 representing the percentage quantity of the data
         :param seed: a seed value for the random function: default to None
         :param save_intent (optional) if the intent contract should be saved to the property manager
@@ -897,11 +854,13 @@ class SyntheticIntentModel(AbstractIntentModel):
             prefix = ''
         if suffix is None:
             suffix = ''
-        rtn_list = []
-        for i in self.get_number(range_value=from_value, to_value=to_value, at_most=1, size=size, precision=0,
-                                 seed=seed, save_intent=False):
-            rtn_list.append("{}{}{}".format(prefix, i, suffix))
-        return self._set_quantity(rtn_list, quantity=quantity, seed=seed)
+        skip = skip if isinstance(skip, int) and skip > 0 else 0
+        _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
+        values = self._unique_integers(low=int(round(from_value, 0)), high=int(round(to_value, 0)), size=size,
+                                       seed=_seed, skip=skip)
+        values = np.char.add(np.char.add(str(prefix), values.astype(str)), str(suffix))
+        return self._set_quantity(values, quantity=quantity, generator=generator)
 
     def get_tagged_pattern(self, pattern: [str, list], tags: dict, weight_pattern: list=None, size: int=None,
                            quantity: [float, int]=None, seed: int=None, save_intent: bool=None,
@@ -912,7 +871,8 @@ class SyntheticIntentModel(AbstractIntentModel):
                 { '<slogan>': {'action': '', 'kwargs': {}},
                   '<phone>': {'action': '', 'kwargs': {}}
                 }
-            where action is a self method name and kwargs are the arguments to pass
+            where action is a self method name and kwargs are the arguments to pass, else the action is taken as the
+            value. Each tag action is run once for the whole size and tags are matched as literal text
             for sample data use get_custom
 
         :param pattern: a string or list of strings to apply the ta substitution too
@@ -944,35 +904,58 @@ class SyntheticIntentModel(AbstractIntentModel):
         pattern = self._pm.list_formatter(pattern)
         if not isinstance(tags, dict):
             raise ValueError("The 'tags' parameter must be a dictionary")
-        class_methods = self.__dir__
-
-        rtn_list = []
-        for _ in range(size):
-            _seed = self._next_seed(_seed, seed)
-            choice = self.get_category(pattern, weight_pattern=weight_pattern, seed=_seed, size=1, save_intent=False)[0]
-            for tag, action in tags.items():
-                method = action.get('action')
-                if method in class_methods:
-                    kwargs = action.get('kwargs')
-                    result = eval(f"self.{method}('save_intent=False, **{kwargs})")[0]
-                else:
-                    result = method
-                choice = re.sub(tag, str(result), str(choice))
-            rtn_list.append(choice)
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
-
-    def get_custom(self, code_str: str, quantity: float=None, size: int=None, seed: int=None, save_intent: bool=None,
-                   column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
-                   remove_duplicates: bool=None, **kwargs) -> list:
-        """returns a number based on the random func. The code should generate a value per line
+        generator = self._generator(_seed)
+        templates = [self._tagged_pattern_template(str(p), tuple(tags.keys())) for p in pattern]
+        select_index = np.asarray(self.get_number(len(pattern), weight_pattern=weight_pattern, size=size, quantity=1,
+                                                  seed=_seed, save_intent=False), dtype=int)
+        # each tag used by the chosen patterns is resolved once for all the rows
+        chosen = set(np.unique(select_index).tolist())
+        used = {text for i in chosen for is_tag, text in templates[i] if is_tag}
+        class_methods = self.__dir__()
+        tag_values = {}
+        for tag in used:
+            action = tags.get(tag)
+            action = action if isinstance(action, dict) else {'action': action}
+            method = action.get('action')
+            if method in class_methods:
+                func = getattr(self, method)
+                kwargs = action.get('kwargs')
+                kwargs = dict(kwargs) if isinstance(kwargs, dict) else {}
+                kwargs.update({'size': size, 'save_intent': False})
+                if 'seed' in inspect.signature(func).parameters and kwargs.get('seed') is None:
+                    kwargs['seed'] = int(generator.integers(2 ** 31))
+                tag_values[tag] = np.array(list(map(str, func(**kwargs))), dtype=object)
+            else:
+                tag_values[tag] = str(method)
+        rtn_values = np.empty(size, dtype=object)
+        for i in chosen:
+            idx = np.flatnonzero(select_index == i)
+            # object arrays of str concatenate faster than np.char.add
+            result = ''
+            for is_tag, text in templates[i]:
+                value = tag_values.get(text) if is_tag else text
+                result = result + (value[idx] if isinstance(value, np.ndarray) else value)
+            rtn_values[idx] = result
+        return self._set_quantity(rtn_values, quantity=quantity, generator=generator)
+
+    def get_custom(self, code_str: str, quantity: float=None, size: int=None, seed: int=None, vectorized: bool=None,
+                   save_intent: bool=None, column_name: [int, str]=None, intent_order: int=None,
+                   replace_intent: bool=None, remove_duplicates: bool=None, **kwargs) -> list:
+        """returns a number based on the random func. The code should generate a value per line or, if vectorized,
+        an array of length 'size'. A seeded numpy random Generator is in scope as 'generator' and, if vectorized, the
+        size as 'size'. If a seed is given, 'np.random' is a RandomState seeded from it so code using np.random is
+        also reproducible
         example:
-            code_str = 'round(np.random.normal(loc=loc, scale=scale), 3)'
+            code_str = 'round(generator.normal(loc=loc, scale=scale), 3)'
             fbt.get_custom(code_str, loc=0.4, scale=0.1)
+            code_str = 'np.round(generator.normal(loc=loc, scale=scale, size=size), 3)'
+            fbt.get_custom(code_str, vectorized=True, loc=0.4, scale=0.1)
 
         :param code_str: an evaluable code as a string
         :param quantity: (optional) a number between 0 and 1 representing data that isn't null
         :param size: (optional) the size of the sample
         :param seed: (optional) a seed value for the random function: default to None
+        :param vectorized: (optional) if the code is evaluated once returning all the values. Default is False
         :param save_intent (optional) if the intent contract should be saved to the property manager
         :param column_name: (optional) the column name that groups intent to create a column
         :param intent_order: (optional) the order in which each intent should run.
@@ -992,14 +975,24 @@ class SyntheticIntentModel(AbstractIntentModel):
         # Code block for intent
         quantity = self._quantity(quantity)
         size = 1 if size is None else size
+        vectorized = vectorized if isinstance(vectorized, bool) else False
         _seed = self._seed() if seed is None else seed
-
-        rtn_list = []
-        for _ in range(size):
-            _seed = self._next_seed(_seed, seed)
-            local_kwargs = locals().get('kwargs') if 'kwargs' in locals() else dict()
-            rtn_list.append(eval(code_str, globals(), local_kwargs))
-        return self._set_quantity(rtn_list, quantity=quantity, seed=_seed)
+        generator = self._generator(_seed)
+        code = self._compile_code(code_str)
+        code_globals = globals()
+        if isinstance(seed, int):
+            code_globals = {**code_globals, 'np': self._seeded_numpy(seed)}
+        local_kwargs = dict(kwargs)
+        local_kwargs.setdefault('generator', generator)
+        if vectorized:
+            local_kwargs.setdefault('size', size)
+            rtn_values = np.asarray(eval(code, code_globals, local_kwargs))
+            if rtn_values.ndim != 1 or rtn_values.size != size:
+                raise ValueError(f"The vectorized code_str must return an array of length {size}, "
+                                 f"got shape {rtn_values.shape}")
+            return self._set_quantity(rtn_values, quantity=quantity, generator=generator)
+        rtn_list = [eval(code, code_globals, local_kwargs) for _ in range(size)]
+        return self._set_quantity(rtn_list, quantity=quantity, generator=generator)
 
     def remove_columns(self, canonical: pd.DataFrame, headers: [str, list]=None, drop: bool=None,
                        dtype: [str, list]=None, exclude: bool=None, regex: [str, list]=None,
@@ -1069,17 +1062,15 @@ class SyntheticIntentModel(AbstractIntentModel):
         size = 1 if size is None else size
         num_columns = num_columns if isinstance(num_columns, int) else 1
         inc_targets = inc_targets if isinstance(inc_targets, int) else False
+        generator = self._generator(_seed)
         gen = Commons.label_gen()
-        df_rtn = pd.DataFrame()
-        for _ in range(num_columns):
-            _seed = self._next_seed(_seed, seed)
-            a = np.random.choice(range(1, 6))
-            b = np.random.choice(range(1, 6))
-            df_rtn[next(gen)] = self.get_distribution(method='beta', a=a, b=b, precision=3, size=size, seed=_seed,
-                                                      save_intent=False)
+        # the beta shape of each column broadcasts across the rows so the noise is drawn in one call
+        a = generator.integers(1, 6, size=num_columns)
+        b = generator.integers(1, 6, size=num_columns)
+        values = np.round(generator.beta(a, b, size=(size, num_columns)), 3)
+        df_rtn = pd.DataFrame(data=values, columns=[next(gen) for _ in range(num_columns)])
         if inc_targets:
-            result = df_rtn.mean(axis=1)
-            df_rtn['target1'] = result.apply(lambda x: 1 if x > 0.5 else 0)
+            df_rtn['target1'] = (df_rtn.mean(axis=1) > 0.5).astype(int)
             df_rtn['target2'] = df_rtn.iloc[:, :5].mean(axis=1).round(2)
         return df_rtn
 
@@ -1117,16 +1108,16 @@ class SyntheticIntentModel(AbstractIntentModel):
         low_size = int(0.001 * size)
         high_size = size - low_size
         idx = self.get_number(df_high.shape[0], weight_pattern=[10, 7, 6, 5, 4, 3, 2, 0.9] + [0.6]*50 + [0.3]*50,
-                              seed=seed, size=high_size, save_intent=False)
+                              seed=_seed, size=high_size, save_intent=False)
         df_rtn = df_high.iloc[idx]
-        idx = self.get_number(df_low.shape[0], size=low_size, seed=seed, save_intent=False)
+        idx = self.get_number(df_low.shape[0], size=low_size, seed=_seed, save_intent=False)
         df_rtn = df_rtn.append(df_low.iloc[idx])
         df_rtn = Commons.filter_columns(df_rtn, headers=['City', 'Zipcode', 'State', 'StateCode', 'StateAbbrev'])
         df_rtn['Zipcode'] = df['Zipcode'].round(0).astype(int)
         df_rtn['City'] = df_rtn['City'].str.title()
         if isinstance(rename_columns, dict):
             df_rtn = df_rtn.rename(columns=rename_columns)
-        return df_rtn.sample(frac=1).reset_index(drop=True)
+        return df_rtn.sample(frac=1, random_state=self._generator(_seed)).reset_index(drop=True)
 
     def model_analysis(self, analytics_model: dict, size: int=None, seed: int=None, save_intent: bool=None,
                        column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
@@ -1294,14 +1285,14 @@ class SyntheticIntentModel(AbstractIntentModel):
         action = deepcopy(action)
         selection = deepcopy(selection)
         # run the logic
-        select_idx = None
-        for _where in selection:
-            select_idx = self._condition_index(canonical=canonical, condition=_where, select_idx=select_idx)
+        select_mask = self._selection_mask(canonical=canonical, selection=selection)
         if not isinstance(default_action, (str, int, float, dict)):
             default_action = None
-        rtn_values = self._apply_action(canonical, action=default_action)
-        rtn_values.update(self._apply_action(canonical, action=action, select_idx=select_idx))
-        return self._set_quantity(rtn_values.tolist(), quantity=quantity, seed=_seed)
+        # the action and the default are each only run for their own rows
+        selected = self._apply_action(canonical, action=action, select_mask=select_mask)
+        default = self._apply_action(canonical, action=default_action, select_mask=~select_mask)
+        rtn_values = self._merge_masked(select_mask, selected=selected, default=default)
+        return self._set_quantity(rtn_values, quantity=quantity, generator=self._generator(_seed))
 
     def correlate_custom(self, canonical: pd.DataFrame, code_str: str, use_exec: bool=None, save_intent: bool=None,
                          column_name: [int, str]=None, intent_order: int=None, replace_intent: bool=None,
@@ -1336,7 +1327,8 @@ class SyntheticIntentModel(AbstractIntentModel):
         if 'canonical' not in local_kwargs:
             local_kwargs['canonical'] = canonical
 
-        result = exec(code_str, globals(), local_kwargs) if use_exec else eval(code_str, globals(), local_kwargs)
+        code = self._compile_code(code_str, mode='exec' if use_exec else 'eval')
+        result = exec(code, globals(), local_kwargs) if use_exec else eval(code, globals(), local_kwargs)
         if result is None:
             return canonical
         return result
@@ -1405,7 +1397,7 @@ class SyntheticIntentModel(AbstractIntentModel):
         s_values = s_values.combine(result, func=(lambda a, b: f"{a}{sep}{b}"))
         if null_idx.size > 0:
             s_values.iloc[null_idx] = np.nan
-        return s_values.to_list()
+        return self._set_quantity(s_values, quantity=1)
 
     def correlate_forename_to_gender(self, canonical: pd.DataFrame, header: str, categories: list, seed: int=None,
                                      save_intent: bool=None, column_name: [int, str]=None, intent_order: int=None,
@@ -1451,7 +1443,7 @@ class SyntheticIntentModel(AbstractIntentModel):
         result = pd.Series(data=[np.nan] * s_values.size)
         result.loc[m_index] = m_names
         result.loc[f_index] = f_names
-        return result.to_list()
+        return self._set_quantity(result, quantity=1)
 
     def correlate_numbers(self, canonical: pd.DataFrame, header: str, spread: float=None, offset: float=None,
                           weighting_pattern: list=None, multiply_offset: bool=None, precision: int=None,
@@ -1505,15 +1497,16 @@ class SyntheticIntentModel(AbstractIntentModel):
         action = 'multiply' if isinstance(multiply_offset, bool) and multiply_offset else 'add'
         quantity = self._quantity(quantity)
         _seed = seed if isinstance(seed, int) else self._seed()
+        generator = self._generator(_seed)
         if fill_nulls:
-            s_values = s_values.fillna(np.random.choice(s_values.mode(dropna=True)))
+            s_values = s_values.fillna(generator.choice(s_values.mode(dropna=True)))
         null_idx = s_values[s_values.isna()].index
         zero_idx = s_values.where(s_values == 0).dropna().index if keep_zero else []
         if isinstance(offset, (int, float)) and offset != 0:
             s_values = s_values.mul(offset) if action == 'multiply' else s_values.add(offset)
         if isinstance(spread, (int, float)) and spread != 0:
             sample = self.get_number(-abs(spread) / 2, abs(spread) / 2, weight_pattern=weighting_pattern,
-                                     size=s_values.size, save_intent=False)
+                                     size=s_values.size, seed=_seed, save_intent=False)
             s_values = s_values.add(sample)
         if isinstance(min_value, (int, float)):
             if min_value < s_values.max():
@@ -1534,7 +1527,7 @@ class SyntheticIntentModel(AbstractIntentModel):
             s_values = s_values.astype(int)
         if null_idx.size > 0:
             s_values.iloc[null_idx] = np.nan
-        return self._set_quantity(s_values.tolist(), quantity=quantity, seed=_seed)
+        return self._set_quantity(s_values, quantity=quantity, generator=generator)
 
     def correlate_categories(self, canonical: pd.DataFrame, header: str, correlations: list, actions: dict,
                              fill_nulls: bool=None, quantity: float=None, seed: int=None,
@@ -1581,16 +1574,23 @@ class SyntheticIntentModel(AbstractIntentModel):
             raise ValueError(f"The canonical must be a pandas DataFrame")
         if not isinstance(header, str) or header not in canonical.columns:
             raise ValueError(f"The header '{header}' can't be found in the canonical DataFrame")
-        s_values = canonical[header].copy().astype(str)
+        s_values = canonical[header].copy()
+        if isinstance(s_values.dtype, pd.CategoricalDtype):
+            # a categorical is kept encoded with only its categories as strings
+            categories = s_values.cat.categories.astype(str)
+            s_values = s_values.cat.rename_categories(categories) if categories.is_unique else s_values.astype(str)
+        else:
+            s_values = s_values.astype(str)
         if s_values.empty:
             return list()
         fill_nulls = fill_nulls if isinstance(fill_nulls, bool) else False
         quantity = self._quantity(quantity)
         _seed = seed if isinstance(seed, int) else self._seed()
+        generator = self._generator(_seed)
         actions = deepcopy(actions)
         correlations = deepcopy(correlations)
         if fill_nulls:
-            s_values = s_values.fillna(np.random.choice(s_values.mode(dropna=True)))
+            s_values = s_values.fillna(generator.choice(s_values.mode(dropna=True)))
         null_idx = s_values[s_values.isna()].index
         s_values.to_string()
         corr_list = []
@@ -1617,10 +1617,12 @@ class SyntheticIntentModel(AbstractIntentModel):
                     raise ValueError(f"The 'method' key {method} is not a recognised intent method")
             else:
                 result = pd.Series(data=([action] * corr_idx.size), index=corr_idx)
-            s_values.update(result)
+            s_values = self._update_values(s_values, result)
         if null_idx.size > 0:
             s_values.iloc[null_idx] = np.nan
-        return self._set_quantity(s_values.tolist(), quantity=quantity, seed=_seed)
+        if isinstance(s_values.dtype, pd.CategoricalDtype):
+            s_values = s_values.cat.remove_unused_categories()
+        return self._set_quantity(s_values, quantity=quantity, generator=generator)
 
     def correlate_dates(self, canonical: pd.DataFrame, header: str, offset: [int, dict]=None, spread: int=None,
                         spread_units: str=None, spread_pattern: list=None, date_format: str=None,
@@ -1666,9 +1668,9 @@ class SyntheticIntentModel(AbstractIntentModel):
             raise ValueError(f"The canonical must be a pandas DataFrame")
         if not isinstance(header, str) or header not in canonical.columns:
             raise ValueError(f"The header '{header}' can't be found in the canonical DataFrame")
-        values = canonical[header].copy()
+        values = canonical[header]
         if values.empty:
-            return list()
+            return self._set_quantity(list(), quantity=1)
 
         def _clean(control):
             _unit_type = ['years', 'months', 'weeks', 'days', 'leapdays', 'hours', 'minutes', 'seconds']
@@ -1683,24 +1685,25 @@ class SyntheticIntentModel(AbstractIntentModel):
 
         quantity = self._quantity(quantity)
         _seed = self._seed() if seed is None else seed
+        generator = self._generator(_seed)
         fill_nulls = False if fill_nulls is None or not isinstance(fill_nulls, bool) else fill_nulls
         offset = _clean(offset) if isinstance(offset, (dict, int)) else None
         units_allowed = ['W', 'D', 'h', 'm', 's']
         spread_units = spread_units if isinstance(spread_units, str) and spread_units in units_allowed else 'D'
         spread = pd.Timedelta(value=spread, unit=spread_units) if isinstance(spread, int) else None
-        # set minimum date
+        # the min and max dates as UTC nanoseconds, or None if not set
         _min_date = pd.to_datetime(min_date, errors='coerce', infer_datetime_format=True, utc=True)
-        if _min_date is None or _min_date is pd.NaT:
-            _min_date = pd.to_datetime(pd.Timestamp.min, utc=True)
-        # set max date
+        _min_date = None if _min_date is None or _min_date is pd.NaT else _min_date.tz_convert(None).value
         _max_date = pd.to_datetime(max_date, errors='coerce', infer_datetime_format=True, utc=True)
-        if _max_date is None or _max_date is pd.NaT:
-            _max_date = pd.to_datetime(pd.Timestamp.max, utc=True)
-        if _min_date >= _max_date:
+        _max_date = None if _max_date is None or _max_date is pd.NaT else _max_date.tz_convert(None).value
+        if _min_date is not None and _max_date is not None and _min_date >= _max_date:
             raise ValueError(f"the min_date {min_date} must be less than max_date {max_date}")
-        # convert values into datetime
-        s_values = pd.Series(pd.to_datetime(values.copy(), errors='coerce', infer_datetime_format=True,
-                                            dayfirst=day_first, yearfirst=year_first, utc=True))
+        # convert values into UTC int64 nanoseconds with a mask of the nulls
+        s_values = pd.to_datetime(values, errors='coerce', infer_datetime_format=True, dayfirst=day_first,
+                                  yearfirst=year_first, utc=True)
+        dates = pd.Series(s_values).dt.tz_convert(None).to_numpy(dtype='M8[ns]')
+        nulls = np.isnat(dates)
+        dates = dates.view(np.int64).copy()
         if spread is not None:
             if spread_units in ['W', 'D']:
                 value = spread.days
@@ -1709,33 +1712,33 @@ class SyntheticIntentModel(AbstractIntentModel):
                 value = int(spread.to_timedelta64().astype(int)/1000000000)
                 zip_units = 's'
             zip_spread = self.get_number(-abs(value) / 2, (abs(value+1) / 2), weight_pattern=spread_pattern,
-                                         precision=0, size=s_values.size, save_intent=False)
-            zipped_dt = list(zip(zip_spread, [zip_units]*s_values.size))
-            s_values = s_values + np.array([pd.Timedelta(x, y).to_timedelta64() for x, y in zipped_dt])
-        if fill_nulls:
-            s_values = s_values.fillna(np.random.choice(s_values.mode(dropna=True)))
-        null_idx = s_values[s_values.isna()].index
+                                         precision=0, size=dates.size, seed=_seed, save_intent=False)
+            dates += (np.asarray(zip_spread, dtype=float) * pd.Timedelta(1, unit=zip_units).value).astype(np.int64)
+        if fill_nulls and nulls.any() and not nulls.all():
+            dates[nulls] = generator.choice(pd.Series(dates[~nulls]).mode().to_numpy())
+            nulls[:] = False
         if isinstance(offset, dict) and offset:
-            s_values = s_values.add(pd.DateOffset(**offset))
-        if _min_date > pd.to_datetime(pd.Timestamp.min, utc=True):
-            if _min_date > s_values.min():
-                min_idx = s_values.dropna().where(s_values < _min_date).dropna().index
-                s_values.iloc[min_idx] = _min_date
-            else:
-                raise ValueError(f"The min value {min_date} is greater than the max result value {s_values.max()}")
-        if _max_date < pd.to_datetime(pd.Timestamp.max, utc=True):
-            if _max_date < s_values.max():
-                max_idx = s_values.dropna().where(s_values > _max_date).dropna().index
-                s_values.iloc[max_idx] = _max_date
+            if set(offset.keys()).issubset(['weeks', 'days', 'hours', 'minutes', 'seconds']):
+                # fixed units reduce to a single time delta
+                dates += pd.Timedelta(**offset).value
             else:
-                raise ValueError(f"The max value {max_date} is less than the min result value {s_values.min()}")
+                dates[nulls] = np.datetime64('NaT').view(np.int64)
+                dates = (pd.Series(dates.view('M8[ns]')) + pd.DateOffset(**offset)).to_numpy(dtype='M8[ns]')
+                dates = dates.view(np.int64).copy()
+        if not nulls.all():
+            if _min_date is not None and _min_date > dates[~nulls].max():
+                raise ValueError(f"The min value {min_date} is greater than the max result value "
+                                 f"{pd.Timestamp(dates[~nulls].max())}")
+            if _max_date is not None and _max_date < dates[~nulls].min():
+                raise ValueError(f"The max value {max_date} is less than the min result value "
+                                 f"{pd.Timestamp(dates[~nulls].min())}")
+        if _min_date is not None or _max_date is not None:
+            dates = np.clip(dates, _min_date, _max_date)
+        dates[nulls] = np.datetime64('NaT').view(np.int64)
+        rtn_values = dates.view('M8[ns]')
         if isinstance(date_format, str):
-            s_values = s_values.dt.strftime(date_format)
-        else:
-            s_values = s_values.dt.tz_convert(None)
-        if null_idx.size > 0:
-            s_values.iloc[null_idx].apply(lambda x: np.nan)
-        return self._set_quantity(s_values.tolist(), quantity=quantity, seed=_seed)
+            rtn_values = pd.Series(rtn_values).dt.strftime(date_format)
+        return self._set_quantity(rtn_values, quantity=quantity, generator=generator)
 
     """
         PRIVATE METHODS SECTION
@@ -1766,6 +1769,464 @@ class SyntheticIntentModel(AbstractIntentModel):
                                       save_intent=save_intent)
         return
 
+    def _compile_intent(self, columns: [str, list]=None) -> dict:
+        """ compiles the intent contract into an execution plan of the column order, the column dependencies and,
+        for each column, the ordered steps of bound intent method, resolved parameters and method type. The plan is
+        cached against a hash of the intent section so is only recompiled when the intent contract changes.
+
+        :param columns: (optional) a single or list of intent_level to run, if list, run in order given
+        :return: the execution plan dictionary
+        """
+        intent_hash = hashlib.sha1(str(self._pm.get_intent()).encode()).hexdigest()
+        plan_key = str(columns)
+        with self._intent_plans_lock:
+            if self._intent_plans.get('intent_hash') != intent_hash:
+                self._intent_plans = {'intent_hash': intent_hash, 'plans': {}}
+            plan = self._intent_plans.get('plans').get(plan_key)
+        if plan is not None:
+            return plan
+        column_names = self._intent_columns(columns)
+        class_methods = self.__dir__()
+        steps = dict()
+        for column in column_names:
+            steps[column] = []
+            level_key = self._pm.join(self._pm.KEY.intent_key, column)
+            for order in sorted(self._pm.get(level_key, {})):
+                for method, params in self._pm.get(self._pm.join(level_key, order), {}).items():
+                    if method not in class_methods:
+                        continue
+                    params.update(params.pop('kwargs', {}))
+                    _ = params.pop('intent_creator', 'Unknown')
+                    func = getattr(self, method)
+                    if str(method).startswith('get_'):
+                        kind = 'get'
+                    elif str(method).startswith('model_'):
+                        kind = 'model'
+                    elif str(method).startswith('remove_'):
+                        kind = 'remove'
+                    else:
+                        kind = 'canonical'
+                    has_seed = 'seed' in inspect.signature(func).parameters
+                    steps[column].append((order, method, func, params, kind, has_seed))
+        plan = {'columns': column_names,
+                'dependencies': self._intent_dependencies(columns=column_names),
+                'remove': [c for c in column_names if self._is_remove_column(c)],
+                'steps': steps}
+        with self._intent_plans_lock:
+            if self._intent_plans.get('intent_hash') == intent_hash:
+                self._intent_plans.get('plans')[plan_key] = plan
+        return plan
+
+    def _intent_columns(self, columns: [str, list]=None) -> list:
+        """ returns the list of intent levels to run. If columns are given they are run in the order given else all
+        the intent is put in order of model, get, correlate, associate and remove.
+
+        :param columns: (optional) a single or list of intent_level to run
+        :return: a list of intent levels
+        """
+        if isinstance(columns, (str, list)):
+            return self._pm.list_formatter(columns)
+        _model = []
+        _get = []
+        _correlate = []
+        _associate = []
+        _remove = []
+        for column in self._pm.get_intent().keys():
+            for order in self._pm.get(self._pm.join(self._pm.KEY.intent_key, column), {}):
+                for method in self._pm.get(self._pm.join(self._pm.KEY.intent_key, column, order), {}).keys():
+                    if str(method).startswith('model_'):
+                        _model.append(column)
+                    elif str(method).startswith('get_'):
+                        _get.append(column)
+                    elif str(method).startswith('correlate_'):
+                        if column in _get:
+                            _get.remove(column)
+                        _correlate.append(column)
+                    elif str(method).startswith('associate_'):
+                        if column in _get:
+                            _get.remove(column)
+                        _associate.append(column)
+                    elif str(method).startswith('remove_'):
+                        if column in _get:
+                            _get.remove(column)
+                        _remove.append(column)
+        return Commons.unique_list(_model + _get + _correlate + _associate + _remove)
+
+    def _run_intent_canonical(self, size: int, plan: dict, workers: int=None, seed: int=None, chunk: int=None,
+                              offset: int=None, profile: list=None, cache: [bool, str]=None,
+                              **kwargs) -> pd.DataFrame:
+        """ runs a compiled intent plan, scheduling each column once its dependencies are met. The column results
+        are collected in a columnar buffer, preallocated in column order, and the DataFrame is built once at the end.
+        Each column is only given a view of the columns it depends on. If cache is set, columns whose cache key is
+        unchanged are taken from the cache rather than run.
+
+        :param size: the size of the outcome data set
+        :param plan: the compiled execution plan (see '_compile_intent')
+        :param workers: (optional) the number of worker threads to run independent columns concurrently
+        :param seed: (optional) a run seed that the seed of each column intent is derived from
+        :param chunk: (optional) the chunk index when run as part of a chunked run
+        :param offset: (optional) the row offset of the chunk in the whole outcome when run as part of a chunked run
+        :param profile: (optional) a list to append the profile record of each intent method run to
+        :param cache: (optional) True to cache column results in memory or a directory path to cache as Parquet files
+        :param kwargs: additional parameters to pass beyond the contracted parameters
+        :return: a pandas dataframe
+        """
+        workers = workers if isinstance(workers, int) and workers > 1 else 1
+        # only trace memory allocations if profiling and not already being traced
+        trace_memory = isinstance(profile, list) and not tracemalloc.is_tracing()
+        column_names = plan.get('columns')
+        depends_on = plan.get('dependencies')
+        dependencies = {column: set(depends) for column, depends in depends_on.items()}
+        # the columnar buffer of each intent level's results, preallocated in column order
+        buffer = dict.fromkeys(column_names)
+
+        def _view(column: [str, int]) -> dict:
+            view = dict()
+            for level in column_names:
+                if level in depends_on[column] and isinstance(buffer.get(level), dict):
+                    view.update(buffer.get(level))
+            return view
+
+        def _collect(column: [str, int], result: dict, cached: bool=False):
+            if cache and not cached and isinstance(cache_keys.get(column), str):
+                self._set_intent_cache(cache, column=column, chunk=chunk, key=cache_keys.get(column), result=result)
+            if column in plan.get('remove'):
+                for level in buffer.keys():
+                    buffer[level] = None
+            buffer[column] = result
+            done.add(column)
+
+        # the cache key of each column is chained on the keys of the columns it depends on
+        cache_keys = dict()
+
+        def _cache_key(column: [str, int]) -> [str, None]:
+            if column not in cache_keys:
+                cache_keys[column] = None
+                depends = [_cache_key(level) for level in column_names if level in depends_on[column]]
+                if None not in depends:
+                    cache_keys[column] = self._intent_cache_key(column=column, steps=plan.get('steps')[column],
+                                                                size=size, seed=seed, chunk=chunk,
+                                                                offset=offset, depends=depends, **kwargs)
+            return cache_keys[column]
+
+        done = set()
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            while dependencies or running:
+                ready = [column for column, depends in dependencies.items() if depends.issubset(done)]
+                if len(ready) == 0 and len(running) == 0:
+                    raise ValueError(f"The intent columns {list(dependencies.keys())} have a circular "
+                                     f"dependency and can't be scheduled")
+                for column in ready:
+                    dependencies.pop(column)
+                    if cache:
+                        result = self._get_intent_cache(cache, column=column, chunk=chunk, key=_cache_key(column))
+                        if isinstance(result, dict):
+                            _collect(column, result, cached=True)
+                            continue
+                    if executor is None:
+                        _collect(column, self._run_intent_column(column=column, steps=plan.get('steps')[column],
+                                                                 columns=_view(column), size=size, seed=seed,
+                                                                 chunk=chunk, offset=offset, profile=profile,
+                                                                 **kwargs))
+                    else:
+                        future = executor.submit(self._run_intent_column, column=column,
+                                                 steps=plan.get('steps')[column], columns=_view(column), size=size,
+                                                 seed=seed, chunk=chunk, offset=offset, profile=profile,
+                                                 **kwargs)
+                        running[future] = column
+                if len(running) > 0:
+                    finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        _collect(running.pop(future), future.result())
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if trace_memory:
+                tracemalloc.stop()
+        data = dict()
+        for result in buffer.values():
+            if isinstance(result, dict):
+                data.update(result)
+        return pd.DataFrame(data=data)
+
+    def _run_intent_chunks(self, size: int, chunk_size: int, columns: [str, list]=None, workers: int=None,
+                           seed: int=None, profile: list=None, cache: [bool, str]=None, **kwargs) -> Generator:
+        """ a generator that runs the intent pipeline in chunks of chunk_size, yielding each chunk as a DataFrame
+        indexed by its position in the whole outcome.
+
+        :param size: the total size of the outcome data set
+        :param chunk_size: the maximum size of each chunk
+        :param columns: (optional) a single or list of intent_level to run
+        :param workers: (optional) the number of worker threads to run independent columns concurrently
+        :param seed: (optional) a run seed that the seed of each column intent is derived from
+        :param profile: (optional) a list to append the profile record of each intent method run to
+        :param cache: (optional) a directory path to cache the column results of each chunk as Parquet files
+        :param kwargs: additional parameters to pass beyond the contracted parameters
+        :return: a generator of pandas DataFrame
+        """
+        if not self._pm.has_intent():
+            return
+        plan = self._compile_intent(columns)
+        for chunk, start in enumerate(range(0, size, chunk_size)):
+            df = self._run_intent_canonical(size=min(chunk_size, size - start), plan=plan, workers=workers,
+                                            seed=seed, chunk=chunk, offset=start, profile=profile, cache=cache,
+                                            **kwargs)
+            df.index = pd.RangeIndex(start=start, stop=start + df.shape[0])
+            yield df
+
+    def _intent_cache_key(self, column: [str, int], steps: list, size: int, seed: int=None, chunk: int=None,
+                          offset: int=None, depends: list=None, **kwargs) -> [str, None]:
+        """ returns the cache key of a column from its compiled steps, the resolved seed of each step, the size, the
+        chunk, its offset and the cache keys of the columns it depends on. If a step, or an action nested in its
+        parameters, has a seed parameter but no resolved seed, or carries a code string that may draw at random, its
+        outcome can't be reproduced so None is returned. Any other step without a seed parameter is taken as an
+        outcome of its parameters and the columns it depends on.
+
+        :param column: the intent level or column name
+        :param steps: the compiled steps of the column (see '_compile_intent')
+        :param size: the size of the outcome data set
+        :param seed: (optional) the run seed
+        :param chunk: (optional) the chunk index when run as part of a chunked run
+        :param offset: (optional) the row offset of the chunk in the whole outcome when run as part of a chunked run
+        :param depends: (optional) the cache keys of the columns this column depends on
+        :param kwargs: additional parameters passed beyond the contracted parameters
+        :return: a key string or None if the column can't be cached
+        """
+        key = [column, size, chunk or 0, offset or 0, depends or [], sorted(kwargs.items(), key=lambda x: str(x[0]))]
+        for order, method, func, params, kind, has_seed in steps:
+            _seed = None
+            if has_seed:
+                _seed = self._intent_seed({**params, **kwargs}.get('seed'), seed=seed, column=column, order=order,
+                                          chunk=chunk)
+                if not isinstance(_seed, int):
+                    return None
+            if self._has_random_params(params):
+                return None
+            key.append((order, method, params, _seed))
+        return hashlib.sha1(str(key).encode()).hexdigest()
+
+    def _has_random_params(self, params: Any) -> bool:
+        """ returns True if the parameters, or any action nested in them, carry a 'code_str' that may draw at random,
+        or if a nested action, a dict with a 'method' key, runs an intent method that takes a seed without being
+        given one, so the outcome can't be reproduced
+
+        :param params: the parameters to search
+        :return: True if the outcome of the parameters may be random
+        """
+        if isinstance(params, dict):
+            if 'code_str' in params:
+                return True
+            method = params.get('method')
+            if isinstance(method, str) and not method.startswith('@') and hasattr(self, method):
+                if 'seed' in inspect.signature(getattr(self, method)).parameters and \
+                        not isinstance(params.get('seed'), int):
+                    return True
+            return any(self._has_random_params(value) for value in params.values())
+        if isinstance(params, (list, tuple)):
+            return any(self._has_random_params(value) for value in params)
+        return False
+
+    def _get_intent_cache(self, cache: [bool, str], column: [str, int], chunk: int, key: str) -> [dict, None]:
+        """ returns a copy of the cached column result if the cached key matches the key else None
+
+        :param cache: True if the cache is in memory or the directory path of the Parquet file cache
+        :param column: the intent level or column name
+        :param chunk: the chunk index when run as part of a chunked run
+        :param key: the cache key of the column
+        :return: a dictionary of header to values or None
+        """
+        if not isinstance(key, str):
+            return None
+        if isinstance(cache, str):
+            path = os.path.join(cache, f"{key}.parquet")
+            if not os.path.exists(path):
+                return None
+            try:
+                df = pd.read_parquet(path)
+            except (OSError, ValueError, ImportError):
+                # an unreadable cache file is treated as a miss and the column rerun
+                return None
+            # Parquet headers are strings so restore the column name if it was not
+            return {(column if header == str(column) else header): df[header].array
+                    if pd.api.types.is_extension_array_dtype(df[header].dtype) else df[header].to_numpy()
+                    for header in df.columns}
+        cache_key, result = self._intent_cache.get((column, chunk or 0), (None, None))
+        if cache_key != key:
+            return None
+        return {header: values.copy() for header, values in result.items()}
+
+    def _set_intent_cache(self, cache: [bool, str], column: [str, int], chunk: int, key: str, result: dict):
+        """ caches a copy of the column result against its key. In memory, only the latest result of each column and
+        chunk is kept. Results that can't be written to Parquet are not cached.
+
+        :param cache: True if the cache is in memory or the directory path of the Parquet file cache
+        :param column: the intent level or column name
+        :param chunk: the chunk index when run as part of a chunked run
+        :param key: the cache key of the column
+        :param result: the dictionary of header to values
+        """
+        if isinstance(cache, str):
+            path = os.path.join(cache, f"{key}.parquet")
+            df = pd.DataFrame(data={str(header): values for header, values in result.items()})
+            try:
+                df.to_parquet(path, index=False)
+            except (ValueError, TypeError, NotImplementedError, ImportError):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+        # held as the column the values become so a cached result is the same as the run result
+        columns = {header: pd.Series(values, copy=True) for header, values in result.items()}
+        self._intent_cache[(column, chunk or 0)] = (key, {header: values.array
+                                                          if pd.api.types.is_extension_array_dtype(values.dtype)
+                                                          else values.to_numpy()
+                                                          for header, values in columns.items()})
+        return
+
+    def _intent_dependencies(self, columns: [str, list]=None) -> dict:
+        """ builds the dependency graph of the intent contract, where a column depends on any column its intent
+        references, for example the 'header' of a correlate intent, an '@header' action or the 'column' of a
+        correlate_selection condition. Intent that can act on the whole canonical, such as associate_, remove_ or
+        correlate_custom, depend on all the columns that come before them.
+
+        :param columns: (optional) a single or list of intent_level to build the graph for. Default to all
+        :return: an ordered dictionary of column name to the set of column names it depends on
+        """
+        if isinstance(columns, (str, list)):
+            column_names = self._pm.list_formatter(columns)
+        else:
+            column_names = list(self._pm.get_intent().keys())
+        model_columns = []
+        dependencies = dict()
+        for column in column_names:
+            level_key = self._pm.join(self._pm.KEY.intent_key, column)
+            references = set()
+            for order in self._pm.get(level_key, {}):
+                for method, params in self._pm.get(self._pm.join(level_key, order), {}).items():
+                    if str(method).startswith('model_'):
+                        model_columns.append(column)
+                    references.update(self._intent_references(params))
+            depends = set()
+            for header in references:
+                if header in column_names:
+                    depends.add(header)
+                else:
+                    # the header may be one of the many columns built by a model_ intent
+                    depends.update(model_columns)
+            if self._is_barrier_column(column):
+                depends.update(column_names[:column_names.index(column)])
+            depends.discard(column)
+            dependencies[column] = depends
+        # remove intent take columns away so must come after everything else
+        remove_columns = [c for c in column_names if self._is_remove_column(c)]
+        for column in remove_columns:
+            dependencies[column].update([c for c in column_names if c not in remove_columns])
+        return dependencies
+
+    def _run_intent_column(self, column: [str, int], steps: list, columns: dict, size: int, seed: int=None,
+                           chunk: int=None, offset: int=None, profile: list=None, **kwargs) -> dict:
+        """ runs the compiled steps of a single column in order, returning a dictionary of the column results.
+        Intent that need a canonical are given a DataFrame built from the passed columns and any results of earlier
+        orders. When run as part of a chunked run, 'get_identifiers' takes the seed of the first chunk and skips the
+        identifiers of the rows before the chunk offset so the identifiers are unique across chunks.
+
+        :param column: the intent level or column name to run
+        :param steps: the compiled steps of the column (see '_compile_intent')
+        :param columns: a dictionary of header to values of the columns this column depends on
+        :param size: the size of the outcome data set
+        :param seed: (optional) a run seed that the seed of each column intent is derived from
+        :param chunk: (optional) the chunk index when run as part of a chunked run
+        :param offset: (optional) the row offset of the chunk in the whole outcome when run as part of a chunked run
+        :param profile: (optional) a list to append the profile record of each intent method run to
+        :param kwargs: additional parameters to pass beyond the contracted parameters
+        :return: a dictionary of header to values
+        """
+        rtn_columns = dict()
+        for order, method, func, params, kind, has_seed in steps:
+            # the intent methods can modify nested parameters so each run has its own copy
+            params = deepcopy(params)
+            if isinstance(kwargs, dict):
+                params.update(kwargs)
+            # identifiers stream from one seeded permutation so each chunk skips those of the chunks before
+            stream = method == 'get_identifiers' and isinstance(offset, int)
+            if has_seed:
+                _seed = self._intent_seed(params.get('seed'), seed=seed, column=column, order=order,
+                                          chunk=0 if stream else chunk)
+                if isinstance(_seed, int):
+                    params['seed'] = _seed
+            if stream:
+                params['skip'] = (params.get('skip') if isinstance(params.get('skip'), int) else 0) + offset
+            if isinstance(profile, list):
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+                elif tracemalloc.is_tracing():
+                    # before python 3.9 the peak can only be reset by restarting the trace
+                    tracemalloc.stop()
+                    tracemalloc.start()
+                start_wall, start_cpu = time.perf_counter(), self._cpu_time()
+                start_memory = tracemalloc.get_traced_memory()[0]
+            if kind in ['get', 'model']:
+                result = func(size=size, save_intent=False, **params)
+            else:
+                df = pd.DataFrame(data={**columns, **rtn_columns}, index=pd.RangeIndex(size))
+                result = func(canonical=df, save_intent=False, **params)
+            if isinstance(profile, list):
+                wall_time = time.perf_counter() - start_wall
+                profile.append({'column': column, 'order': order, 'intent': method, 'chunk': chunk or 0,
+                                'rows': size, 'wall_time': wall_time, 'cpu_time': self._cpu_time() - start_cpu,
+                                'peak_memory': max(tracemalloc.get_traced_memory()[1] - start_memory, 0),
+                                'rows_per_sec': size / wall_time if wall_time > 0 else np.nan})
+            if kind in ['model', 'remove']:
+                result = pd.DataFrame(result)
+                if kind == 'remove':
+                    rtn_columns = dict()
+                for header in result.columns:
+                    rtn_columns[header] = result[header].to_numpy()
+                continue
+            if len(result) != size:
+                raise IndexError(f"The index size of '{column}' is '{len(result)}', should be {size}")
+            rtn_columns[column] = result.to_numpy() if isinstance(result, pd.Series) else result
+        return rtn_columns
+
+    def _intent_methods(self, column: [str, int]) -> list:
+        """ returns the list of intent method names for a column across all its orders"""
+        level_key = self._pm.join(self._pm.KEY.intent_key, column)
+        methods = []
+        for order in self._pm.get(level_key, {}):
+            methods += list(self._pm.get(self._pm.join(level_key, order), {}).keys())
+        return methods
+
+    def _is_remove_column(self, column: [str, int]) -> bool:
+        """ returns True if the column intent removes columns from the canonical"""
+        return any(str(method).startswith('remove_') for method in self._intent_methods(column))
+
+    def _is_barrier_column(self, column: [str, int]) -> bool:
+        """ returns True if the column intent can act on any or all of the canonical columns"""
+        for method in self._intent_methods(column):
+            if str(method).startswith(('associate_', 'remove_')) or str(method) == 'correlate_custom':
+                return True
+        return False
+
+    @staticmethod
+    def _intent_references(params: Any) -> set:
+        """ walks the intent parameters returning the set of column headers referenced by 'header', 'column' or
+        'default_header' keys, including those in nested actions and selection conditions.
+        """
+        references = set()
+        if isinstance(params, dict):
+            for key, value in params.items():
+                if key in ['header', 'column', 'default_header'] and isinstance(value, (str, int, list)):
+                    references.update([v for v in Commons.list_formatter(value) if isinstance(v, (str, int))])
+                else:
+                    references.update(SyntheticIntentModel._intent_references(value))
+        elif isinstance(params, (list, tuple)):
+            for value in params:
+                references.update(SyntheticIntentModel._intent_references(value))
+        return references
+
     @staticmethod
     def select2dict(column: str, condition: str, expect: str=None, operator: str=None, logic: str=None,
                     date_format: str=None, offset: int=None):
@@ -1806,8 +2267,8 @@ class SyntheticIntentModel(AbstractIntentModel):
         """
         return Commons.param2dict(method=method, **kwargs)
 
-    def _apply_action(self, canonical: pd.DataFrame, action: Any, select_idx: pd.Int64Index=None) -> pd.Series:
-        """ applies an action returning an indexed Series
+    def _apply_action(self, canonical: pd.DataFrame, action: Any, select_mask: np.ndarray=None) -> pd.Series:
+        """ applies an action to the selected rows only, returning an indexed Series
         Special method values
             @header: use a column as the value reference, expects the 'header' key
             @constant: use a value constant, expects the key 'value'
@@ -1815,11 +2276,13 @@ class SyntheticIntentModel(AbstractIntentModel):
 
         :param canonical: a reference canonical
         :param action: the action dictionary
-        :param select_idx: (optional) the index selection of the return Series. if None then canonical index taken
-        :return: pandas Series with passed index
+        :param select_mask: (optional) a boolean mask of the canonical rows to apply the action to. if None all rows
+        :return: pandas Series with the index of the selected rows
         """
-        if not isinstance(select_idx, pd.Int64Index):
-            select_idx = canonical.index
+        if not isinstance(select_mask, np.ndarray):
+            select_mask = np.ones(canonical.shape[0], dtype=bool)
+        select_idx = canonical.index[select_mask]
+        action = dict(action) if isinstance(action, dict) else action
         if isinstance(action, dict):
             method = action.pop('method', None)
             if method is None:
@@ -1827,20 +2290,22 @@ class SyntheticIntentModel(AbstractIntentModel):
             if method in self.__dir__():
                 if str(method).startswith('get_'):
                     action.update({'size': select_idx.size, 'save_intent': False})
-                    result = eval(f"self.{method}(**action)", globals(), locals())
                 elif str(method).startswith('correlate_'):
-                    action.update({'canonical': canonical.iloc[select_idx], 'save_intent': False})
-                    result = eval(f"self.{method}(**action)", globals(), locals())
+                    action.update({'canonical': canonical.iloc[select_mask], 'save_intent': False})
                 else:
                     raise NotImplementedError(f"The method {method} is not implemented as part of the actions")
-                return pd.Series(data=result, index=select_idx)
+                if select_idx.size == 0:
+                    return pd.Series(data=[], index=select_idx, dtype=object)
+                result = getattr(self, method)(**action)
+                # a list is kept as objects rather than have its type inferred element by element
+                return pd.Series(data=result, index=select_idx, dtype=object if isinstance(result, list) else None)
             elif str(method).startswith('@header'):
                 header = action.pop('header', None)
                 if header is None:
                     raise ValueError(f"The action '@header' requires a 'header' key.")
                 if header not in canonical.columns:
                     raise ValueError(f"When executing the action 'use_column', the header {header} was not found")
-                return canonical[header].iloc[select_idx]
+                return canonical[header].iloc[select_mask]
             elif str(method).startswith('@eval'):
                 code_str = action.pop('code_str', None)
                 if code_str is None:
@@ -1857,19 +2322,106 @@ class SyntheticIntentModel(AbstractIntentModel):
         return pd.Series(data=([action] * select_idx.size), index=select_idx)
 
     @staticmethod
-    def _condition_index(canonical: pd.DataFrame, condition: dict, select_idx: pd.Int64Index) -> pd.Int64Index:
-        """ private method to select index from the selection conditions
+    def _merge_masked(select_mask: np.ndarray, selected: pd.Series, default: pd.Series):
+        """ merges the values of the selected rows and of the default rows into one array in row order. The array is
+        preallocated as the common type of the two, or object, and each is written to its rows. Categoricals are
+        merged through the codes of the union of their categories so they stay encoded
+
+        :param select_mask: the boolean mask of the selected rows
+        :param selected: the values of the selected rows in row order
+        :param default: the values of the rows not selected in row order
+        :return: a numpy array or pandas extension array of the merged values
+        """
+        if select_mask.all():
+            return selected.array
+        if not select_mask.any():
+            return default.array
+        if any(isinstance(s.dtype, pd.CategoricalDtype) for s in [selected, default]):
+            parts = [s.array if isinstance(s.dtype, pd.CategoricalDtype) else pd.Categorical(s)
+                     for s in [selected, default]]
+            categories = pd.Index(pd.unique(np.concatenate([np.asarray(p.categories, dtype=object) for p in parts])))
+            codes = np.empty(select_mask.size, dtype=np.int64)
+            codes[select_mask] = parts[0].set_categories(categories).codes
+            codes[~select_mask] = parts[1].set_categories(categories).codes
+            return pd.Categorical.from_codes(codes, categories=categories)
+        (left, right) = (selected.dtype, default.dtype)
+        if left == right and not isinstance(left, np.dtype):
+            # the same extension type is taken into place from the two concatenated
+            order = np.concatenate([np.flatnonzero(select_mask), np.flatnonzero(~select_mask)])
+            position = np.empty(order.size, dtype=np.int64)
+            position[order] = np.arange(order.size)
+            return pd.concat([selected, default], ignore_index=True).array.take(position)
+        if left == right or (isinstance(left, np.dtype) and isinstance(right, np.dtype) and left.kind in 'iuf' and
+                             right.kind in 'iuf'):
+            dtype = np.result_type(left, right)
+        else:
+            dtype = np.dtype(object)
+        rtn_values = np.empty(select_mask.size, dtype=dtype)
+        rtn_values[select_mask] = selected.to_numpy(dtype=dtype)
+        rtn_values[~select_mask] = default.to_numpy(dtype=dtype)
+        return rtn_values
+
+    @staticmethod
+    def _update_values(values: pd.Series, other: pd.Series) -> pd.Series:
+        """ updates the values with the non-null other values on the other index. If the values are categorical any
+        new values are added as categories first so the values stay encoded, and categorical other values are
+        recoded to those categories
+
+        :param values: the pandas Series to update
+        :param other: the pandas Series of values to update with
+        :return: the updated pandas Series
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            known = set(values.cat.categories)
+            new = [v for v in pd.unique(other.dropna()) if v not in known]
+            if len(new) > 0:
+                values = values.cat.add_categories(new)
+            if isinstance(other.dtype, pd.CategoricalDtype):
+                other = other.cat.set_categories(values.cat.categories)
+        values.update(other)
+        return values
+
+    @staticmethod
+    def _selection_mask(canonical: pd.DataFrame, selection: list) -> np.ndarray:
+        """ private method to combine the masks of the selection conditions, in order, by the logic of each
+
+        :param canonical: a pandas DataFrame to select from
+        :param selection: the list of dict conditions
+        :return: a boolean numpy mask of the selected rows, all rows if there are no conditions
+        """
+        select_mask = None
+        for condition in selection:
+            mask = SyntheticIntentModel._condition_mask(canonical=canonical, condition=condition)
+            if select_mask is None:
+                select_mask = mask
+                continue
+            _logic = condition.get('logic', 'and')
+            if str(_logic).lower() == 'and':
+                select_mask &= mask
+            elif str(_logic).lower() == 'or':
+                select_mask |= mask
+            elif str(_logic).lower() == 'not':
+                select_mask &= ~mask
+            elif str(_logic).lower() == 'xor':
+                select_mask ^= mask
+            else:
+                raise ValueError(f"The logic '{_logic}' for column '{condition.get('column')}' is not recognised "
+                                 f"logic. Use 'AND', 'OR', 'NOT', 'XOR'")
+        return np.ones(canonical.shape[0], dtype=bool) if select_mask is None else select_mask
+
+    @staticmethod
+    def _condition_mask(canonical: pd.DataFrame, condition: dict) -> np.ndarray:
+        """ private method to select the rows of a selection condition as a mask. As null values are never selected
+        they are masked out whatever the condition
 
         :param canonical: a pandas DataFrame to select from
         :param condition: the dict conditions
-        :param select_idx: the current selection index of the canonical
-        :return: returns the current select_idx of the condition
+        :return: a boolean numpy mask of the rows the condition selects
         """
         _column = condition.get('column')
         _condition = condition.get('condition')
         _operator = condition.get('operator', '')
         _expect = condition.get('expect', None)
-        _logic = condition.get('logic', 'and')
         if _condition == 'date.now':
             _date_format = condition.get('date_format', "%Y-%m-%dT%H:%M:%S")
             _offset = condition.get('offset', 0)
@@ -1877,84 +2429,464 @@ class SyntheticIntentModel(AbstractIntentModel):
         s_values = canonical[_column]
         if _expect:
             s_values = s_values.astype(_expect)
-        idx = eval(f"s_values.where(s_values{_operator}{_condition}).dropna().index", globals(), locals())
-        if select_idx is None:
-            select_idx = idx
-        else:
-            if str(_logic).lower() == 'and':
-                select_idx = select_idx.intersection(idx)
-            elif str(_logic).lower() == 'or':
-                select_idx = select_idx.union(idx)
-            elif str(_logic).lower() == 'not':
-                select_idx = select_idx.difference(idx)
-            elif str(_logic).lower() == 'xor':
-                select_idx = select_idx.union(idx).difference(select_idx.intersection(idx))
+        plan = SyntheticIntentModel._condition_plan(f"{_operator}{_condition}")
+        if plan[0] == 'compare':
+            (_, _op, value) = plan
+            if isinstance(s_values.dtype, np.dtype) and s_values.dtype.kind in 'iufb' and not isinstance(value, str):
+                # pandas eval uses numexpr when it is installed
+                mask = pd.eval(f"values {_op} value", local_dict={'values': s_values.to_numpy(), 'value': value})
             else:
-                raise ValueError(f"The logic '{_logic}' for column '{_column}' is not recognised logic. "
-                                 f"Use 'AND', 'OR', 'NOT', 'XOR'")
-        return select_idx
+                compare = {'==': operator.eq, '!=': operator.ne, '>=': operator.ge, '<=': operator.le,
+                           '>': operator.gt, '<': operator.lt}
+                mask = compare[_op](s_values, value)
+        else:
+            mask = eval(plan[1], globals(), {'s_values': s_values})
+        if isinstance(mask, pd.Series):
+            mask = mask.to_numpy(dtype=bool, na_value=False)
+        return np.asarray(mask, dtype=bool) & s_values.notna().to_numpy()
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _condition_plan(expression: str) -> tuple:
+        """ compiles, and memoizes, a condition expression. A comparison to a literal is kept as its operator and
+        value so it can be run straight on the values, anything else is compiled as code on 's_values'
+
+        :param expression: the operator and condition of a selection condition
+        :return: a tuple of ('compare', operator, value) or ('eval', code)
+        """
+        match = re.fullmatch(r"\s*(==|!=|>=|<=|>|<)\s*(.+?)\s*", expression)
+        if match is not None:
+            try:
+                value = ast.literal_eval(match.group(2))
+            except (ValueError, SyntaxError):
+                value = None
+            if isinstance(value, (str, int, float, bool)):
+                return 'compare', match.group(1), value
+        return 'eval', compile(f"s_values{expression}", '<condition>', 'eval')
+
+    @staticmethod
+    def _convert_date2value(dates: Any, day_first: bool = True, year_first: bool = False) -> np.ndarray:
+        """ converts a date or list of dates to an int64 array of nanoseconds since the epoch, with tz aware dates
+        taken as UTC"""
+        values = pd.to_datetime(pd.Series(dates), errors='coerce', infer_datetime_format=True, dayfirst=day_first,
+                                yearfirst=year_first, utc=True)
+        return values.dt.tz_convert(None).to_numpy(dtype='M8[ns]').view(np.int64)
+
+    @staticmethod
+    def _convert_value2date(values: Any, date_format: str=None) -> list:
+        """ converts int64 nanoseconds since the epoch to a list of pd.Timestamp, or strings if a date_format is
+        given"""
+        dates = pd.Series(np.asarray(values, dtype=np.int64).view('M8[ns]'))
+        if isinstance(date_format, str):
+            return dates.dt.strftime(date_format).to_list()
+        return dates.to_list()
 
     @staticmethod
-    def _convert_date2value(dates: Any, day_first: bool = True, year_first: bool = False):
-        values = pd.to_datetime(dates, errors='coerce', infer_datetime_format=True, dayfirst=day_first,
-                                yearfirst=year_first)
-        return mdates.date2num(pd.Series(values)).tolist()
+    @lru_cache(maxsize=256)
+    def _tagged_pattern_template(pattern: str, tags: tuple) -> tuple:
+        """ compiles, and memoizes, a tagged pattern into its literal and tag segments. Tags are matched as literal
+        text with the longest tag taking precedence.
+
+        :param pattern: the pattern to compile
+        :param tags: a tuple of the tags to find in the pattern
+        :return: a tuple of (is_tag, text) segment pairs in pattern order
+        """
+        if len(tags) == 0:
+            return ((False, pattern),)
+        regex = re.compile("(" + "|".join(re.escape(t) for t in sorted(tags, key=len, reverse=True)) + ")")
+        tag_set = set(tags)
+        segments = []
+        for part in regex.split(pattern):
+            if len(part) > 0:
+                segments.append((part in tag_set, part))
+        return tuple(segments)
 
     @staticmethod
-    def _convert_value2date(values: Any, date_format: str=None):
-        dates = []
-        for date in mdates.num2date(values):
-            date = pd.Timestamp(date)
-            if isinstance(date_format, str):
-                date = date.strftime(date_format)
-            dates.append(date)
-        return dates
-
-    def _date_choice(self, start, until, weight_pattern: list, limits: str=None,
-                     seed: int=None):
-        """ Utility method to choose a random date between two dates based on a pattern.
+    @lru_cache(maxsize=256)
+    def _string_pattern_plan(pattern: str, choices: tuple=None, choice_only: bool=None) -> tuple:
+        """ compiles, and memoizes, a string pattern into a plan of the options for each position of the string. If
+        every option is a single character the options are unicode code points and the plan is fixed width.
+
+        :param pattern: the pattern to create the string from
+        :param choices: (optional) a tuple of the reference char and tuple of choices pairs. Default to the defaults
+        :param choice_only: (optional) if to only use the choices given or to take not found characters as is
+        :return: a tuple of the plan, a tuple of an options array for each position, and if the plan is fixed width
+        """
+        if choices is None:
+            choices = {'c': list(string.ascii_letters),
+                       'd': list(string.digits),
+                       'l': list(string.ascii_lowercase),
+                       'U': list(string.ascii_uppercase),
+                       'p': list(string.punctuation),
+                       's': [' '],
+                       }
+            choices.update({p: [p] for p in list(string.punctuation)})
+        else:
+            choices = {k: list(v) for k, v in choices}
+        plan = []
+        for c in list(pattern):
+            if c in choices.keys():
+                plan.append(choices[c])
+            elif not choice_only:
+                plan.append([c])
+        fixed_width = all(len(option) == 1 for options in plan for option in options)
+        if fixed_width:
+            plan = [np.array([ord(option) for option in options], dtype=np.uint32) for options in plan]
+        else:
+            plan = [np.array(options, dtype=str) for options in plan]
+        for options in plan:
+            options.setflags(write=False)
+        return tuple(plan), fixed_width
+
+    def _date_choice(self, start, until, weight_pattern: list, limits: str=None, size: int=None,
+                     generator: np.random.Generator=None):
+        """ Utility method to choose a random date between two dates based on a pattern. The date range is cut into
+        as many bins as the pattern, a bin is chosen by its weight and a date is chosen from within that bin.
 
         :param start: the start boundary
         :param until: the boundary to go up to
         :param weight_pattern: The weight pattern to apply to the range selection
         :param limits: (optional) time units that have pattern limits
-        :param seed: (optional) a seed value for the random function: default to None
-        :return: a choice from the range
+        :param size: (optional) the number of choices to return as a datetime64 array. Default a single choice
+        :param generator: (optional) the numpy random Generator to draw from: default to a new unseeded Generator
+        :return: a choice from the range, or an array of choices if size is given, with NaT if there is no choice
         """
-        seed = self._seed() if seed is None else seed
-        np.random.seed(seed)
+        generator = generator if isinstance(generator, np.random.Generator) else self._generator()
         diff = (until-start).days
         freq = 'Y' if diff > 4000 else 'M' if diff > 500 else 'D' if diff > 100 else 'H' if diff > 2 else 'T'
-        date_range = pd.date_range(start, until, freq=freq)
         _pattern = weight_pattern
         if limits in ['month', 'hour']:
             units = {'month': [11, start.month-1, until.month-1], 'hour': [23, start.hour, until.hour]}
             start_idx = int(np.round(((len(_pattern)-1) / units.get(limits)[0]) * (units.get(limits)[1]), 2))
             end_idx = int(np.round(((len(_pattern)-1) / units.get(limits)[0]) * (units.get(limits)[2]), 2))
             _pattern = _pattern[start_idx:end_idx+1]
-        date_bins = pd.cut(date_range, bins=len(_pattern))
-        index = self._weighted_choice(_pattern, seed=seed)
-        if index is None:
-            return pd.NaT
-        index_date = date_bins.categories[index]
-        return pd.Timestamp(np.random.choice(pd.date_range(index_date.left, index_date.right, freq=freq)))
-
-    def _weighted_choice(self, weights: list, seed: int=None):
+        if not isinstance(size, int):
+            return pd.Timestamp(self._date_choice(start, until, weight_pattern, limits=limits, size=1,
+                                                  generator=generator)[0])
+        bin_table = self._date_bin_table(pd.Timestamp(start), pd.Timestamp(until), freq, tuple(_pattern))
+        if bin_table is None or size == 0:
+            return np.full(size, np.datetime64('NaT'), dtype='M8[ns]')
+        (table, offsets, lengths) = bin_table
+        index = self._alias_choice(_pattern, size=size, generator=generator)
+        position = offsets[index] + (generator.random(size) * lengths[index]).astype(np.int64)
+        return table[np.where(lengths[index] > 0, position, table.size - 1)]
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _date_bin_table(start: pd.Timestamp, until: pd.Timestamp, freq: str, weight_pattern: tuple) -> [tuple, None]:
+        """ builds, and memoizes, the bin table of a date range at the freq cut into as many bins as the pattern.
+        The table is a flat datetime64 array of the dates of each bin, ending in a NaT for the choices of a bin with
+        no dates, with the offset and length of each bin in the table. The arrays are read only as they are shared by
+        every call with the same range and pattern.
+
+        :param start: the start boundary
+        :param until: the boundary to go up to
+        :param freq: the frequency of the dates in the date range
+        :param weight_pattern: the weight pattern as a tuple
+        :return: a tuple of the table, offsets and lengths or None if there is nothing to choose
+        """
+        weights = np.asarray(weight_pattern, dtype=float)
+        date_range = pd.date_range(start, until, freq=freq)
+        if date_range.size == 0 or weights.size == 0 or weights.sum() <= 0:
+            return None
+        date_bins = pd.cut(date_range, bins=weights.size)
+        bin_dates = [pd.date_range(interval.left, interval.right, freq=freq).to_numpy(dtype='M8[ns]')
+                     for interval in date_bins.categories]
+        lengths = np.array([dates.size for dates in bin_dates])
+        offsets = np.cumsum(lengths) - lengths
+        table = np.concatenate(bin_dates + [np.array(['NaT'], dtype='M8[ns]')])
+        for values in [table, offsets, lengths]:
+            values.setflags(write=False)
+        return table, offsets, lengths
+
+    def _date_window_choice(self, values: np.ndarray, valid: np.ndarray, start: pd.Timestamp, until: pd.Timestamp,
+                            unit: str, weight_pattern: list, limits: str=None,
+                            generator: np.random.Generator=None) -> np.ndarray:
+        """ chooses a date based on a pattern from within the day, unit 'D', or hour, unit 'H', of each valid value.
+        The window is the whole day or hour unless the value falls on the day or hour of start or until, in which
+        case the window starts at start or ends at until. As only the time within the window is of use, the values
+        are grouped by which of the bounds apply and a choice made for each group.
+
+        :param values: the int64 nanosecond dates
+        :param valid: a boolean mask of the values to choose for
+        :param start: the start boundary
+        :param until: the until boundary
+        :param unit: the window of each value, 'D' for the day or 'H' for the hour
+        :param weight_pattern: The weight pattern to apply to the window
+        :param limits: (optional) time units that have pattern limits
+        :param generator: (optional) the numpy random Generator to draw from: default to a new unseeded Generator
+        :return: a datetime64 array of the choices, with NaT where there was no choice or the value is not valid
+        """
+        unit_ns = pd.Timedelta(1, unit=unit.lower()).value
+        rtn_dates = np.full(values.size, np.datetime64('NaT'), dtype='M8[ns]')
+        period = values // unit_ns
+        start_period = start.value // unit_ns
+        until_period = until.value // unit_ns
+        for on_start in [False, True]:
+            for on_until in [False, True]:
+                rows = valid & ((period == start_period) == on_start) & ((period == until_period) == on_until)
+                if not rows.any():
+                    continue
+                anchor = pd.Timestamp((until_period if on_until and not on_start else start_period) * unit_ns)
+                window_start = start if on_start else anchor
+                window_end = until if on_until else anchor + pd.Timedelta(unit_ns - 10**9)
+                rtn_dates[rows] = self._date_choice(window_start, window_end, weight_pattern, limits=limits,
+                                                    size=int(rows.sum()), generator=generator)
+        return rtn_dates
+
+    @staticmethod
+    def _date_parts(values: np.ndarray) -> dict:
+        """ splits int64 nanosecond or datetime64 values into a dictionary of int64 arrays of the year, month, day,
+        hour, minute, second and the nanosecond fraction of the second"""
+        dates = np.asarray(values).astype('M8[ns]')
+        days = dates.astype('M8[D]')
+        months = days.astype('M8[M]')
+        time_ns = (dates - days).astype(np.int64)
+        return {'year': months.astype(np.int64) // 12 + 1970, 'month': months.astype(np.int64) % 12 + 1,
+                'day': (days - months).astype(np.int64) + 1, 'hour': time_ns // 3_600_000_000_000,
+                'minute': time_ns // 60_000_000_000 % 60, 'second': time_ns // 1_000_000_000 % 60,
+                'fraction': time_ns % 1_000_000_000}
+
+    @staticmethod
+    def _date_compose(parts: dict) -> np.ndarray:
+        """ composes the dictionary of date parts from '_date_parts' back into int64 nanoseconds, with the day
+        clipped to the last day of the month"""
+        months = ((parts['year'] - 1970) * 12 + parts['month'] - 1).astype('M8[M]')
+        days_in_month = ((months + 1).astype('M8[D]') - months.astype('M8[D]')).astype(np.int64)
+        days = months.astype('M8[D]') + (np.minimum(parts['day'], days_in_month) - 1)
+        return (days.astype('M8[ns]').astype(np.int64) + parts['hour'] * 3_600_000_000_000 +
+                parts['minute'] * 60_000_000_000 + parts['second'] * 1_000_000_000 + parts['fraction'])
+
+    def _weighted_choice(self, weights: list, size: int=None, generator: np.random.Generator=None):
         """ a probability weighting based on the values in the integer list
 
         :param weights: a list of integers representing a pattern of weighting
-        :param seed: a seed value for the random function: default to None
-        :return: an index of which weight was randomly chosen
+        :param size: (optional) the number of choices to return as a numpy array. Default a single choice
+        :param generator: (optional) the numpy random Generator to draw from: default to a new unseeded Generator
+        :return: an index of which weight was randomly chosen or an array of indices if size is given
         """
         if not isinstance(weights, list) or not all(isinstance(x, (int, float, list)) for x in weights):
             raise ValueError("The weighted pattern must be an list of integers")
-        seed = self._seed() if seed is None else seed
-        np.random.seed(seed)
-        rnd = np.random.random() * sum(weights)
-        for i, w in enumerate(weights):
-            rnd -= w
-            if rnd < 0:
-                return i
+        generator = generator if isinstance(generator, np.random.Generator) else self._generator()
+        if not isinstance(size, int):
+            choice = self._weighted_choice(weights, size=1, generator=generator)
+            return int(choice[0]) if choice.size > 0 else None
+        if sum(weights) <= 0:
+            return np.full(size, len(weights) - 1) if len(weights) > 0 else np.array([], dtype=int)
+        return self._alias_choice(weights, size=size, generator=generator)
+
+    def _alias_choice(self, weights: list, size: int, generator: np.random.Generator=None) -> np.ndarray:
+        """ draws size independent weighted indices of the weights from the memoized alias table of the weights
+
+        :param weights: a list of numbers representing a pattern of weighting
+        :param size: the number of indices to draw
+        :param generator: (optional) the numpy random Generator to draw from: default to a new unseeded Generator
+        :return: a numpy array of indices
+        """
+        generator = generator if isinstance(generator, np.random.Generator) else self._generator()
+        (prob, alias) = self._alias_table(tuple(float(w) for w in weights))
+        index = generator.integers(prob.size, size=size)
+        return np.where(generator.random(size) < prob[index], index, alias[index])
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _alias_table(weights: tuple) -> tuple:
+        """ builds, and memoizes, the Walker alias table of a weight pattern using Vose's method, so a weighted index
+        is one uniform index and one uniform comparison whatever the number of weights. The arrays are read only as
+        they are shared by every call with the same pattern.
+
+        :param weights: the weight pattern as a tuple
+        :return: a tuple of the probability and alias arrays
+        """
+        n = len(weights)
+        total = sum(weights)
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("The weighted pattern must have at least one positive weight and no negative weights")
+        prob = [w * n / total for w in weights]
+        alias = list(range(n))
+        small = [i for i, p in enumerate(prob) if p < 1]
+        large = [i for i, p in enumerate(prob) if p >= 1]
+        while small and large:
+            (s, l) = (small.pop(), large.pop())
+            alias[s] = l
+            prob[l] = prob[l] + prob[s] - 1
+            (small if prob[l] < 1 else large).append(l)
+        # what is left over is a rounding error away from one
+        for i in small + large:
+            prob[i] = 1.0
+        prob = np.array(prob, dtype=float)
+        alias = np.array(alias, dtype=np.int64)
+        for values in [prob, alias]:
+            values.setflags(write=False)
+        return prob, alias
+
+    def _alias_number_bins(self, edges: np.ndarray, weights: list, size: int, is_int: bool, precision: int,
+                           generator: np.random.Generator) -> np.ndarray:
+        """ returns a numpy array of size random numbers, each from a bin between the edges independently chosen by
+        the weights, with a value uniform within its bin excluding the high edge, as with _number_bin
+
+        :param edges: the bin edges, one more than the weights
+        :param weights: a list of numbers representing a pattern of weighting
+        :param size: the number of values to return
+        :param is_int: if the values are integers
+        :param precision: the precision of float values
+        :param generator: the numpy random Generator to draw from
+        :return: a numpy array of values
+        """
+        index = self._alias_choice(weights, size=size, generator=generator)
+        low = edges[index]
+        width = edges[index + 1] - low
+        if is_int:
+            return low + (generator.random(size) * np.maximum(width, 1)).astype(np.int64)
+        values = np.round(generator.random(size) * width + low, precision)
+        # redraw any value that has rounded up to its high edge
+        redraw = (values >= low + width) & (width > 0)
+        while redraw.any():
+            values[redraw] = np.round(generator.random(redraw.sum()) * width[redraw] + low[redraw], precision)
+            redraw = (values >= low + width) & (width > 0)
+        return values
+
+    def _weighted_counts(self, weights: list, size: int, capacity: [list, np.ndarray]=None,
+                         bounded_weighting: bool=None, generator: np.random.Generator=None) -> np.ndarray:
+        """ returns the number of selections in each weighted bin for a sample of size. If bounded, the counts are
+        proportional to the weights else the counts are a multinomial draw of the weights. No count is more than
+        its bin capacity and the counts always add up to the size.
+
+        :param weights: a list of numbers representing a pattern of weighting
+        :param size: the total size of the sample
+        :param capacity: (optional) the most selections each bin can hold. Default no limit
+        :param bounded_weighting: (optional) if the counts are a hard proportion of the weights. Default True
+        :param generator: (optional) the numpy random Generator to draw from: default to a new unseeded Generator
+        :return: a numpy array of counts
+        """
+        bounded_weighting = bounded_weighting if isinstance(bounded_weighting, bool) else True
+        generator = generator if isinstance(generator, np.random.Generator) else self._generator()
+        weights = np.asarray(weights, dtype=float)
+        if weights.size == 0 or weights.sum() <= 0:
+            raise ValueError("The weighted pattern must have at least one positive weight")
+        if bounded_weighting:
+            expected = weights * (size / weights.sum())
+            counter = np.round(expected).astype(int)
+            # a positive weight that rounds to nothing keeps a chance of being chosen
+            missing = (counter == 0) & (weights > 0)
+            counter[missing] = generator.random(missing.sum()) < expected[missing]
+        else:
+            counter = generator.multinomial(size, weights / weights.sum())
+        capacity = np.full(weights.size, np.iinfo(np.int64).max) if capacity is None else np.asarray(capacity)
+        counter = np.minimum(counter, capacity)
+        # balance the counts to the size with a weighted draw over the bins with room to change
+        remaining = size - counter.sum()
+        while remaining != 0:
+            if remaining > 0:
+                room = (weights > 0) & (counter < capacity)
+            else:
+                room = (weights > 0) & (counter > 0)
+            if not room.any():
+                raise ValueError(f"The weight pattern bins can only hold {int(counter.sum())} of the size {size}")
+            _weights = np.where(room, weights, 0)
+            change = generator.multinomial(abs(remaining), _weights / _weights.sum())
+            if remaining > 0:
+                counter += np.minimum(change, capacity - counter)
+            else:
+                counter -= np.minimum(change, counter)
+            remaining = size - counter.sum()
+        return counter
+
+    @staticmethod
+    def _number_bin(low: [int, float], high: [int, float], count: int, at_most: int, exclude: list, is_int: bool,
+                    precision: int, generator: np.random.Generator) -> np.ndarray:
+        """ returns a numpy array of count random numbers between low and high, excluding the high value
+
+        :param low: the lower bound of the bin
+        :param high: the upper bound of the bin
+        :param count: the number of values to return
+        :param at_most: the most times a value should be chosen, zero for no limit
+        :param exclude: values to exclude from the selection
+        :param is_int: if the values are integers
+        :param precision: the precision of float values
+        :param generator: the numpy random Generator to draw from
+        :return: a numpy array
+        """
+        if count <= 0:
+            return np.array([], dtype=int if is_int else float)
+        if is_int and 0 < at_most and max(high - low, 1) * at_most < count:
+            raise ValueError(f"The range {low} to {high} can only hold {max(high - low, 1) * at_most} values when "
+                             f"each is chosen at most {at_most} times, not the size {count}")
+        if (is_int and high - low <= 1) or (not is_int and low >= high):
+            return np.full(count, low)
+        if at_most > 0:
+            # select unique values at_most times over
+            sections = []
+            section_size = count if at_most == 1 else int(np.ceil(count / at_most))
+            for _ in range(at_most):
+                if is_int:
+                    sections.append(SyntheticIntentModel._unique_integers(
+                        low=low, high=high, size=section_size, seed=int(generator.integers(2**62))))
+                    continue
+                multiplier = generator.integers(1000, 50000)
+                num_choice = np.linspace(low, high, num=count + multiplier, dtype=float, endpoint=False)
+                sections.append(generator.choice(num_choice, size=section_size, replace=False))
+            values = np.concatenate(sections)[:count]
+            if at_most > 1:
+                generator.shuffle(values)
+            return values
+        exclude = np.asarray(exclude) if is_int else np.asarray(exclude + [high])
+        sections = []
+        remaining = count
+        while remaining > 0:
+            if is_int:
+                values = generator.integers(low=low, high=high, size=remaining)
+            else:
+                values = np.round(generator.random(size=remaining) * (high - low) + low, precision)
+            if exclude.size > 0:
+                values = values[~np.isin(values, exclude)]
+            sections.append(values)
+            remaining -= values.size
+        return np.concatenate(sections)
+
+    @staticmethod
+    def _unique_integers(low: int, high: int, size: int, seed: int=None, skip: int=None) -> np.ndarray:
+        """ returns a numpy array of size unique integers between low and high, excluding high, taken in order from a
+        seeded random permutation of the range after skipping the first skip values. Small ranges are permuted
+        directly. Large ranges use a keyed Feistel network with cycle walking as the permutation, so memory is
+        proportional to the size rather than the range and the same seed and skip always give the same values.
+
+        :param low: the lower bound of the range
+        :param high: the upper bound of the range, excluded
+        :param size: the number of unique integers
+        :param seed: (optional) the seed of the permutation
+        :param skip: (optional) the number of values in the permutation to skip
+        :return: a numpy int64 array
+        """
+        skip = skip if isinstance(skip, int) and skip > 0 else 0
+        span = high - low
+        if size + skip > span:
+            raise ValueError(f"Unable to select {size} unique values from a range of {span} when skipping {skip}")
+        generator = np.random.Generator(np.random.PCG64(seed))
+        if span <= 1 << 20:
+            return generator.permutation(span)[skip:skip + size].astype(np.int64) + low
+        keys = generator.integers(0, np.iinfo(np.uint64).max, size=6, dtype=np.uint64, endpoint=True)
+        bits = int(span - 1).bit_length()
+        half = np.uint64((bits + 1) // 2)
+        mask = np.uint64((1 << int(half)) - 1)
+
+        def _permute(values: np.ndarray) -> np.ndarray:
+            left, right = values >> half, values & mask
+            for key in keys:
+                mixed = (right ^ key) * np.uint64(0x9E3779B97F4A7C15)
+                mixed ^= mixed >> np.uint64(29)
+                mixed *= np.uint64(0xBF58476D1CE4E5B9)
+                mixed ^= mixed >> np.uint64(32)
+                left, right = right, left ^ (mixed & mask)
+            return (left << half) | right
+
+        values = _permute(np.arange(skip, skip + size, dtype=np.uint64))
+        # cycle walk any value outside the range back into it
+        outside = values >= np.uint64(span)
+        while outside.any():
+            values[outside] = _permute(values[outside])
+            outside = values >= np.uint64(span)
+        return values.astype(np.int64) + low
 
     def _normailse_weights(self, weights: list, size: int=None, count: int=None, length: int=None):
         """normalises a complex weight pattern and returns the appropriate weight pattern
@@ -1996,34 +2928,167 @@ class SyntheticIntentModel(AbstractIntentModel):
             rtn_pattern.append(rtn_weights[index])
         return rtn_pattern
 
-    def _set_quantity(self, selection, quantity, seed=None):
-        """Returns the quantity percent of good values in selection with the rest fill"""
-        if quantity == 1:
+    def _set_quantity(self, selection, quantity, generator: np.random.Generator=None):
+        """Returns the quantity percent of good values in selection with the rest fill, as the model return type.
+        If the return type is 'array' the nulls are written into the array in place. A categorical selection is
+        returned as a pandas Categorical whatever the return type with the nulls written into its codes"""
+        if isinstance(selection, pd.Series) and isinstance(selection.dtype, pd.CategoricalDtype):
+            selection = selection.array
+        if isinstance(selection, pd.Categorical):
+            if quantity == 1 or len(selection) == 0:
+                return selection
+            generator = generator if isinstance(generator, np.random.Generator) else self._generator()
+            codes = selection.codes.copy()
+            codes[self._null_mask(len(selection), quantity, generator=generator)] = -1
+            return pd.Categorical.from_codes(codes, dtype=selection.dtype)
+        if self._return_type == 'array':
+            selection = self._to_array(selection)
+            if quantity == 1 or len(selection) == 0:
+                return selection
+            generator = generator if isinstance(generator, np.random.Generator) else self._generator()
+            return self._mask_nulls(selection, self._null_mask(len(selection), quantity, generator=generator))
+        selection = self._to_list(selection)
+        if quantity == 1 or len(selection) == 0:
+            return selection
+        generator = generator if isinstance(generator, np.random.Generator) else self._generator()
+        mask = self._null_mask(len(selection), quantity, generator=generator)
+        if not mask.any():
             return selection
-        seed = self._seed() if seed is None else seed
-        np.random.seed(seed)
-        random.seed(seed)
-
-        def replace_fill():
-            """Used to run through all the possible fill options for the list type"""
-            if isinstance(selection[i], float):
-                selection[i] = np.nan
-            elif isinstance(selection[i], str):
-                selection[i] = ''
+        # an object array filled from the list so the elements, and their types, are kept as they are
+        values = np.empty(len(selection), dtype=object)
+        values[:] = selection
+        # the fill is nan for floats, an empty string for strings and None for anything else
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred == 'floating':
+            values[mask] = np.nan
+        elif inferred == 'string':
+            values[mask] = ''
+        elif inferred.startswith('mixed'):
+            values[mask] = [np.nan if isinstance(value, float) else '' if isinstance(value, str) else None
+                            for value in values[mask]]
+        else:
+            values[mask] = None
+        return values.tolist()
+
+    @staticmethod
+    def _null_mask(size: int, quantity: float, generator: np.random.Generator) -> np.ndarray:
+        """ returns a boolean mask of the values to set to null so only the quantity percent of values are kept. Below
+        100 values each value is nulled with a probability of 1 - quantity, otherwise exactly the rounded count is.
+        A small count is chosen directly, a larger one is drawn as a Bernoulli mask that is then corrected by the few
+        values it is over or under, rather than a choice that would shuffle an index of the whole size"""
+        if size < 100:
+            return generator.random(size) > quantity
+        sample_count = int(round(size * (1 - quantity), 0))
+        if sample_count <= size // 50:
+            mask = np.zeros(size, dtype=bool)
+            mask[generator.choice(size, size=sample_count, replace=False)] = True
+            return mask
+        mask = generator.random(size, dtype=np.float32) < (1 - quantity)
+        difference = int(np.count_nonzero(mask)) - sample_count
+        if difference > 0:
+            mask[generator.choice(np.flatnonzero(mask), size=difference, replace=False)] = False
+        elif difference < 0:
+            mask[generator.choice(np.flatnonzero(~mask), size=-difference, replace=False)] = True
+        return mask
+
+    @staticmethod
+    def _mask_nulls(values: [np.ndarray, pd.api.extensions.ExtensionArray], mask: np.ndarray):
+        """ sets the masked values to the null of their dtype in place, moving integer and boolean arrays to their
+        pandas nullable extension dtype as numpy has no null for them"""
+        if not mask.any():
+            return values
+        if isinstance(values, np.ndarray):
+            if values.dtype.kind == 'f':
+                values[mask] = np.nan
+                return values
+            if values.dtype.kind in 'mM':
+                values[mask] = np.datetime64('NaT') if values.dtype.kind == 'M' else np.timedelta64('NaT')
+                return values
+            if values.dtype.kind in 'iu':
+                values = pd.array(values, dtype='Int64')
+            elif values.dtype.kind == 'b':
+                values = pd.array(values, dtype='boolean')
             else:
-                selection[i] = None
-            return
+                values[mask] = None
+                return values
+        values[mask] = None
+        return values
 
-        if len(selection) < 100:
-            for i in range(len(selection)):
-                if np.random.random() > quantity:
-                    replace_fill()
-        else:
-            sample_count = int(round(len(selection) * (1 - quantity), 0))
-            indices = random.sample(list(range(len(selection))), sample_count)
-            for i in indices:
-                replace_fill()
-        return selection
+    @staticmethod
+    def _to_array(values: Any) -> [np.ndarray, pd.api.extensions.ExtensionArray]:
+        """ converts values to a numpy array, or a pandas nullable extension array where numpy has no null for the
+        dtype or the values are strings"""
+        if isinstance(values, pd.Series):
+            if pd.api.types.is_extension_array_dtype(values.dtype):
+                return values.array
+            values = values.to_numpy()
+        if isinstance(values, pd.api.extensions.ExtensionArray):
+            return values
+        if isinstance(values, np.ndarray) and values.dtype.kind in 'US':
+            # fixed width strings have no nulls so are boxed straight into the string array
+            return pd.arrays.StringArray(values.astype(str).astype(object))
+        if isinstance(values, np.ndarray) and values.dtype.kind != 'O':
+            return values
+        values = values if isinstance(values, (list, np.ndarray)) else list(values)
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        has_nulls = bool(pd.isna(np.asarray(values, dtype=object)).any()) if len(values) > 0 else False
+        if inferred == 'string':
+            return pd.array(values, dtype='string')
+        if inferred == 'integer':
+            return pd.array(values, dtype='Int64') if has_nulls else np.asarray(values, dtype=np.int64)
+        if inferred in ['floating', 'mixed-integer-float']:
+            return np.asarray(values, dtype=np.float64)
+        if inferred == 'boolean':
+            return pd.array(values, dtype='boolean') if has_nulls else np.asarray(values, dtype=bool)
+        if inferred in ['datetime', 'datetime64']:
+            values = pd.to_datetime(pd.Series(values, dtype=object))
+            return values.to_numpy() if values.dt.tz is None else values.array
+        return pd.Series(values, dtype=object).to_numpy()
+
+    @staticmethod
+    def _to_list(values: Any) -> list:
+        """ converts values to a python list, keeping numpy integers as the elements of integer arrays"""
+        if isinstance(values, list):
+            return values
+        if isinstance(values, np.ndarray):
+            if values.dtype.kind in 'iu':
+                return list(values)
+            if values.dtype.kind in 'mM':
+                return pd.Series(values).to_list()
+            return values.tolist()
+        if isinstance(values, (pd.Series, pd.api.extensions.ExtensionArray)):
+            return values.tolist()
+        return list(values)
+
+    @staticmethod
+    def _cpu_time() -> float:
+        """ returns the cpu time of the current thread, or of the process before python 3.7 where there is no
+        thread time"""
+        return time.thread_time() if hasattr(time, 'thread_time') else time.process_time()
+
+    @staticmethod
+    def _intent_seed(intent_seed: [int, None], seed: int=None, column: [str, int]=None, order: [str, int]=None,
+                     chunk: int=None) -> [int, None]:
+        """ derives the seed for a column intent from the run seed and the intent seed using a SeedSequence, keyed on
+        the column, intent order and chunk, so each column and chunk has an independent and reproducible seed.
+        If neither a run seed nor an intent seed is given then None is returned.
+
+        :param intent_seed: the seed in the intent contract, if any
+        :param seed: (optional) the run seed
+        :param column: (optional) the column name or intent level
+        :param order: (optional) the intent order within the column
+        :param chunk: (optional) the chunk index
+        :return: a derived seed or the intent seed if there is nothing to derive from
+        """
+        if not isinstance(seed, int) and not isinstance(chunk, int):
+            return intent_seed
+        entropy = [s for s in [seed, intent_seed] if isinstance(s, int)]
+        if len(entropy) == 0:
+            return None
+        spawn_key = (zlib.crc32(str(column).encode()), zlib.crc32(str(order).encode()),
+                     chunk if isinstance(chunk, int) else 0)
+        # keep within 30 bits to leave headroom for seeds that are incremented row by row
+        return int(np.random.SeedSequence(entropy=entropy, spawn_key=spawn_key).generate_state(1)[0] >> 2)
 
     @staticmethod
     def _quantity(quantity: [float, int]) -> float:
@@ -2036,11 +3101,48 @@ class SyntheticIntentModel(AbstractIntentModel):
 
     @staticmethod
     def _seed():
-        return int(time.time() * np.random.random())
-
-    def _next_seed(self, seed: int, default: int):
-        seed += 1
-        if seed > 2 ** 31:
-            seed = self._seed() if isinstance(default, int) else default
-        np.random.seed(seed)
-        return seed
+        """returns a random seed from fresh OS entropy without touching any global random state"""
+        return int(np.random.SeedSequence().generate_state(1)[0] >> 2)
+
+    @staticmethod
+    def _generator(seed: int=None) -> np.random.Generator:
+        """returns a PCG64 numpy random Generator seeded with the seed or fresh OS entropy if the seed is None"""
+        return np.random.Generator(np.random.PCG64(seed))
+
+    @staticmethod
+    def _seeded_numpy(seed: int) -> types.ModuleType:
+        """ returns a stand in for the numpy module whose 'random' draws from a RandomState seeded with the seed, so
+        code strings written against np.random are reproducible without touching the global random state
+
+        :param seed: the seed of the RandomState
+        :return: a module with the attributes of numpy and a seeded 'random'
+        """
+        random_state = np.random.RandomState(np.random.MT19937(seed))
+        seeded_random = types.ModuleType('numpy.random')
+        seeded_random.__dict__.update(np.random.__dict__)
+        seeded_random.__dict__.update({name: getattr(random_state, name) for name in dir(random_state)
+                                       if not name.startswith('_')})
+        seeded_numpy = types.ModuleType('numpy')
+        seeded_numpy.__dict__.update(np.__dict__)
+        seeded_numpy.random = seeded_random
+        return seeded_numpy
+
+    @staticmethod
+    def _check_parquet_engine():
+        """ raises an ImportError if neither pyarrow nor fastparquet is installed to read and write the Parquet files
+        of a directory cache"""
+        if importlib.util.find_spec('pyarrow') is None and importlib.util.find_spec('fastparquet') is None:
+            raise ImportError("A directory cache is written as Parquet files which requires pyarrow or fastparquet. "
+                              "Install with 'pip install discovery-behavioral-utils[parquet]'")
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile_code(code_str: str, mode: str=None):
+        """ compiles, and memoizes, a code string so it is only parsed once across rows and runs
+
+        :param code_str: the code string to compile
+        :param mode: (optional) the compile mode 'eval' or 'exec'. Default is 'eval'
+        :return: a code object
+        """
+        mode = mode if isinstance(mode, str) else 'eval'
+        return compile(code_str, '<code_str>', mode)
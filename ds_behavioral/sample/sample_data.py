@@ -1,5 +1,4 @@
 from os.path import abspath, join, dirname
-import time
 from pathlib import Path
 
 import pandas as pd
@@ -31,10 +30,9 @@ class AbstractSample(ABC):
         """private method to select from a series
         :param shuffle:
         """
-        seed = int(time.time() * np.random.random()) if not isinstance(seed, int) else seed
-        np.random.seed(seed)
+        seed = seed if isinstance(seed, int) else None
         if shuffle:
-            np.random.shuffle(selection)
+            np.random.default_rng(seed).shuffle(selection)
         if not isinstance(size, int) or not 0 < size < len(selection):
             size = len(selection) - 1
         return selection[:size]
@@ -62,8 +62,11 @@ setup(
     install_requires=[
         'pandas>1.0',
         'aistac-foundation',
-        'discovery-connectors',
-        'matplotlib'
+        'discovery-connectors'
     ],
+    extras_require={
+        # the Parquet directory cache of the intent pipeline
+        'parquet': ['pyarrow'],
+    },
     test_suite='tests',
 )
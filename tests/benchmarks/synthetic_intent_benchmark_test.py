@@ -0,0 +1,283 @@
+"""
+Benchmarks the rows per second and peak traced memory of the SyntheticIntentModel intent methods and the intent
+pipeline at each of the benchmark sizes, printing a report once all the benchmarks have run. The benchmarks are
+skipped in a normal test run unless HADRON_BENCHMARK is set.
+
+    HADRON_BENCHMARK: if set, runs the benchmarks
+    HADRON_BENCHMARK_LARGE: if set, also benchmarks at 10 million rows
+    HADRON_BENCHMARK_PATH: if set, the file path the benchmark report is written to as csv
+"""
+import unittest
+import os
+import shutil
+import time
+import tracemalloc
+import pandas as pd
+from ds_behavioral import SyntheticBuilder
+from ds_behavioral.intent.synthetic_intent_model import SyntheticIntentModel
+from aistac.properties.property_manager import PropertyManager
+
+
+@unittest.skipUnless(os.environ.get('HADRON_BENCHMARK'), "set HADRON_BENCHMARK to run the benchmarks")
+class SyntheticIntentBenchmarkTest(unittest.TestCase):
+
+    # the intent methods that are not benchmarked and why
+    EXCLUDED = {'get_from': 'needs a connector contract to a dataset',
+                'model_analysis': 'needs an analytics model from ds_discovery'}
+
+    results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        df = pd.DataFrame(data=cls.results, columns=['intent', 'case', 'size', 'seconds', 'rows_per_sec',
+                                                     'peak_memory'])
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(df.to_string(index=False))
+        if isinstance(os.environ.get('HADRON_BENCHMARK_PATH'), str):
+            df.to_csv(os.environ.get('HADRON_BENCHMARK_PATH'), index=False)
+
+    def setUp(self):
+        os.environ['HADRON_PM_PATH'] = os.path.join('work', 'config')
+        os.environ['HADRON_DEFAULT_PATH'] = os.path.join('work', 'data')
+        try:
+            os.makedirs(os.environ['HADRON_PM_PATH'])
+            os.makedirs(os.environ['HADRON_DEFAULT_PATH'])
+        except:
+            pass
+        PropertyManager._remove_all()
+
+    def tearDown(self):
+        try:
+            shutil.rmtree('work')
+        except:
+            pass
+
+    @property
+    def tools(self) -> SyntheticIntentModel:
+        return SyntheticBuilder.scratch_pad()
+
+    @property
+    def sizes(self) -> list:
+        sizes = [1_000, 100_000]
+        if os.environ.get('HADRON_BENCHMARK_LARGE'):
+            sizes.append(10_000_000)
+        return sizes
+
+    def benchmark(self, intent: str, size: int, func, case: str=None):
+        """ times the func and then reruns it with tracemalloc to find its peak memory"""
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        del result
+        tracemalloc.start()
+        try:
+            _ = func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.results.append({'intent': intent, 'case': case or '', 'size': size, 'seconds': round(seconds, 4),
+                             'rows_per_sec': int(size / seconds) if seconds > 0 else None,
+                             'peak_memory': peak_memory})
+
+    def canonical(self, size: int) -> pd.DataFrame:
+        """a representative canonical for the correlate intent"""
+        tools = self.tools
+        df = pd.DataFrame()
+        df['numbers'] = tools.get_number(1, 1000, size=size, seed=31)
+        df['floats'] = tools.get_number(0.0, 100.0, precision=2, size=size, seed=31)
+        df['cat'] = tools.get_category(selection=list('ABCDE'), size=size, seed=31)
+        df['gender'] = tools.get_category(selection=['M', 'F'], size=size, seed=31)
+        df['dates'] = tools.get_datetime(start='2020-01-01', until='2021-01-01', size=size, seed=31)
+        return df
+
+    def test_coverage(self):
+        tools = self.tools
+        intent = [m for m in dir(tools) if m.startswith(('get_', 'correlate_', 'model_', 'remove_'))]
+        benchmarked = [m[5:] for m in dir(self) if m.startswith('test_')]
+        for method in intent:
+            if method in self.EXCLUDED:
+                continue
+            self.assertIn(method, benchmarked, f"The intent method '{method}' has no benchmark")
+
+    def test_get_number(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_number', size, lambda: tools.get_number(1, 1000, size=size))
+            self.benchmark('get_number', size, lambda: tools.get_number(0.0, 1.0, precision=3, size=size),
+                           case='float')
+            self.benchmark('get_number', size, lambda: tools.get_number(1, 1000, weight_pattern=[1, 4, 2, 8, 1],
+                                                                        size=size), case='weight_pattern')
+            self.benchmark('get_number', size, lambda: tools.get_number(1, size * 3, at_most=1, size=size),
+                           case='at_most')
+            self.benchmark('get_number', size, lambda: tools.get_number(1, 1000, dominant_values=[0, 1],
+                                                                        dominant_percent=0.6, size=size),
+                           case='dominant_values')
+
+    def test_get_category(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_category', size, lambda: tools.get_category(selection=list('ABCDEFGH'),
+                                                                            weight_pattern=[4, 1, 3, 2], size=size))
+
+    def test_get_datetime(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_datetime', size, lambda: tools.get_datetime(start='2020-01-01', until='2021-01-01',
+                                                                            size=size))
+
+    def test_get_datetime_pattern(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_datetime_pattern', size,
+                           lambda: tools.get_datetime_pattern(start='2020-01-01', until='2021-01-01', default=0.4,
+                                                              month_pattern=[1, 1, 2, 2, 1, 1, 0, 0, 1, 1, 2, 2],
+                                                              weekday_pattern=[1, 1, 1, 1, 1, 0, 0],
+                                                              hour_pattern=[0] * 8 + [1] * 10 + [0] * 6, size=size))
+
+    def test_get_intervals(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_intervals', size, lambda: tools.get_intervals(intervals=[(0, 10), (20, 30), (50, 90)],
+                                                                              weight_pattern=[1, 2, 1], size=size))
+
+    def test_get_distribution(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_distribution', size, lambda: tools.get_distribution(method='normal', loc=0, scale=1,
+                                                                                    size=size))
+
+    def test_get_string_pattern(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_string_pattern', size, lambda: tools.get_string_pattern(pattern='cCddd-dd',
+                                                                                        size=size))
+
+    def test_get_tagged_pattern(self):
+        tools = self.tools
+        tags = {'<name>': {'action': 'get_category', 'kwargs': {'selection': ['Jo', 'Al', 'Sam']}},
+                '<num>': {'action': 'get_number', 'kwargs': {'range_value': 1, 'to_value': 100}},
+                '<company>': {'action': 'ACME'}}
+        for size in self.sizes:
+            self.benchmark('get_tagged_pattern', size,
+                           lambda: tools.get_tagged_pattern(pattern=['Hi <name>, save <num>% at <company>', 'Hello'],
+                                                            tags=tags, weight_pattern=[4, 1], size=size))
+
+    def test_get_profile_middle_initials(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_profile_middle_initials', size,
+                           lambda: tools.get_profile_middle_initials(size=size))
+
+    def test_get_profile_surname(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_profile_surname', size, lambda: tools.get_profile_surname(size=size))
+
+    def test_get_identifiers(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_identifiers', size, lambda: tools.get_identifiers(from_value=1_000_000,
+                                                                                  to_value=100_000_000, size=size))
+
+    def test_get_custom(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('get_custom', size, lambda: tools.get_custom('round(generator.normal(loc=0, scale=1), 3)',
+                                                                        size=size))
+            self.benchmark('get_custom', size,
+                           lambda: tools.get_custom('np.round(generator.normal(loc=0, scale=1, size=size), 3)',
+                                                    vectorized=True, size=size), case='vectorized')
+
+    def test_model_noise(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('model_noise', size, lambda: tools.model_noise(num_columns=5, size=size))
+
+    def test_model_us_zip(self):
+        tools = self.tools
+        for size in self.sizes:
+            self.benchmark('model_us_zip', size, lambda: tools.model_us_zip(size=size))
+
+    def test_remove_columns(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            self.benchmark('remove_columns', size, lambda: tools.remove_columns(df, headers=['cat', 'dates']))
+
+    def test_correlate_selection(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            selection = [tools.select2dict(column='cat', condition="== 'A'"),
+                         tools.select2dict(column='numbers', condition='>500', logic='AND')]
+            action = tools.action2dict(method='correlate_numbers', header='floats', offset=1.2, multiply_offset=True)
+            self.benchmark('correlate_selection', size,
+                           lambda: tools.correlate_selection(df, selection=selection, action=action,
+                                                             default_action=tools.action2dict(method='@header',
+                                                                                              header='floats')))
+
+    def test_correlate_custom(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            self.benchmark('correlate_custom', size,
+                           lambda: tools.correlate_custom(df, code_str="canonical['numbers'] * 2"))
+
+    def test_correlate_join(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            action = tools.action2dict(method='correlate_numbers', header='numbers')
+            self.benchmark('correlate_join', size, lambda: tools.correlate_join(df, header='cat', action=action,
+                                                                                sep='-'))
+
+    def test_correlate_forename_to_gender(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            self.benchmark('correlate_forename_to_gender', size,
+                           lambda: tools.correlate_forename_to_gender(df, header='gender', categories=['M', 'F']))
+
+    def test_correlate_numbers(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            self.benchmark('correlate_numbers', size, lambda: tools.correlate_numbers(df, header='floats', spread=5,
+                                                                                      precision=2))
+
+    def test_correlate_categories(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            self.benchmark('correlate_categories', size,
+                           lambda: tools.correlate_categories(df, header='cat', correlations=[['A', 'B'], ['C']],
+                                                              actions={0: 'X', 1: {'method': 'get_number',
+                                                                                   'to_value': 10}}))
+
+    def test_correlate_dates(self):
+        tools = self.tools
+        for size in self.sizes:
+            df = self.canonical(size)
+            self.benchmark('correlate_dates', size, lambda: tools.correlate_dates(df, header='dates', offset=2,
+                                                                                  spread=5, spread_units='D'))
+
+    def test_run_intent_pipeline(self):
+        tools = SyntheticBuilder.from_env('benchmark', default_save=False, default_save_intent=True,
+                                          reset_templates=False).intent_model
+        tools.get_number(1, 1000, weight_pattern=[1, 4, 2, 8, 1], column_name='numbers')
+        tools.get_category(selection=['M', 'F'], weight_pattern=[6, 4], column_name='gender')
+        tools.get_datetime(start='2020-01-01', until='2021-01-01', column_name='joined')
+        tools.get_string_pattern(pattern='cCddd', column_name='code')
+        tools.correlate_numbers(pd.DataFrame({'numbers': [1]}), header='numbers', spread=5, column_name='value')
+        tools.correlate_dates(pd.DataFrame({'joined': [pd.Timestamp('2020-01-01')]}), header='joined', offset=30,
+                              column_name='renewal')
+        tools.correlate_forename_to_gender(pd.DataFrame({'gender': ['M']}), header='gender', categories=['M', 'F'],
+                                           column_name='forename')
+        for size in self.sizes:
+            self.benchmark('run_intent_pipeline', size, lambda: tools.run_intent_pipeline(size=size))
+            self.benchmark('run_intent_pipeline', size, lambda: tools.run_intent_pipeline(size=size, workers=4),
+                           case='workers')
+
+
+if __name__ == '__main__':
+    unittest.main()
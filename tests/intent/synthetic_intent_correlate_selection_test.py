@@ -2,6 +2,7 @@ import unittest
 import os
 import shutil
 import pandas as pd
+import numpy as np
 from ds_behavioral import SyntheticBuilder
 from ds_behavioral.intent.synthetic_intent_model import SyntheticIntentModel
 from aistac.properties.property_manager import PropertyManager
@@ -49,6 +50,23 @@ class SyntheticIntentCorrelateSelectionTest(unittest.TestCase):
         result = tools.correlate_selection(df, selection=selection, action=9)
         self.assertEqual([9.0, None, None, 9.0, None, None], result)
 
+    def test_selection_mask(self):
+        tools = self.tools
+        df = pd.DataFrame()
+        df['letters'] = ['A', 'B', 'A', 'B', None, 'C']
+        df['value'] = [1, 4, np.nan, 1, 6, 1]
+        selection = [tools.select2dict(column='value', condition="!= 4")]
+        self.assertEqual([True, False, False, True, True, True], tools._selection_mask(df, selection).tolist())
+        selection = [tools.select2dict(column='letters', condition="== 'A'"),
+                     tools.select2dict(column='value', condition=">3", logic='XOR'),
+                     tools.select2dict(column='letters', condition=".isin(['C'])", logic='OR'),
+                     tools.select2dict(column='value', condition="==1", logic='NOT')]
+        self.assertEqual([False, True, True, False, True, False], tools._selection_mask(df, selection).tolist())
+        self.assertTrue(all(tools._selection_mask(df, [])))
+        # the condition plans are memoized
+        self.assertEqual(('compare', '>', 3), tools._condition_plan('>3'))
+        self.assertIs(tools._condition_plan(".isin(['C'])"), tools._condition_plan(".isin(['C'])"))
+
     def test_action_header(self):
         tools = self.tools
         df = pd.DataFrame()
@@ -59,6 +77,36 @@ class SyntheticIntentCorrelateSelectionTest(unittest.TestCase):
         result = tools.correlate_selection(df, selection=selection, action=action, default_action=-1)
         self.assertEqual([1, -1, 2, -1, -1, -1], result)
 
+    def test_action_categorical(self):
+        tools = self.tools
+        df = pd.DataFrame()
+        df['letters'] = pd.Categorical(['A', 'B', 'A', 'B', 'B', 'C'])
+        df['value'] = [1, 4, 2, 1, 6, 1]
+        selection = [tools.select2dict(column='value', condition=">3")]
+        action = tools.action2dict(method="@constant", value='D')
+        default_action = tools.action2dict(method="@header", header='letters')
+        result = tools.correlate_selection(df, selection=selection, action=action, default_action=default_action)
+        self.assertIsInstance(result, pd.Categorical)
+        self.assertEqual(['A', 'D', 'A', 'B', 'D', 'C'], result.to_list())
+
+    def test_action_masked(self):
+        tools = self.tools
+        df = pd.DataFrame()
+        df['value'] = tools.get_number(0, 100, size=1000, seed=31)
+        selection = [tools.select2dict(column='value', condition=">49")]
+        action = tools.action2dict(method='get_number', range_value=100, to_value=200)
+        default_action = tools.action2dict(method='get_string_pattern', pattern='dd')
+        result = pd.Series(tools.correlate_selection(df, selection=selection, action=action,
+                                                     default_action=default_action, seed=31))
+        selected = df['value'] > 49
+        self.assertTrue(result[selected].between(100, 199).all())
+        self.assertTrue(result[~selected].map(lambda x: isinstance(x, str) and len(x) == 2).all())
+        # the common type of the action and default is kept
+        result = tools._merge_masked(selected.to_numpy(), selected=df['value'][selected].astype(float),
+                                     default=pd.Series([-1] * (~selected).sum()))
+        self.assertEqual('float64', result.dtype)
+        self.assertEqual(df['value'].where(selected, -1).to_list(), result.tolist())
+
     def test_action_method(self):
         tools = self.tools
         df = pd.DataFrame()
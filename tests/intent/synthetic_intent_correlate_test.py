@@ -151,7 +151,22 @@ class SyntheticIntentCorrelateTest(unittest.TestCase):
         correlation = [list("ABC"), list("DEFGH")]
         action = {0: False, 1: True}
         result = tools.correlate_categories(df, 'cat', correlations=correlation, actions=action)
-        self.assertEqual([False, False, False, True, True, True, True, True], result)
+        # a categorical header stays encoded
+        self.assertIsInstance(result, pd.Categorical)
+        self.assertEqual([False, True], result.categories.to_list())
+        self.assertEqual([False, False, False, True, True, True, True, True], result.to_list())
+        df = pd.DataFrame({'cat': tools.get_category(selection=list("ABC"), size=1000, seed=31, categorical=True)})
+        result = tools.correlate_categories(df, 'cat', correlations=[['A']], actions={0: 'X'}, quantity=0.9)
+        self.assertIsInstance(result, pd.Categorical)
+        self.assertCountEqual(['X', 'B', 'C'], result.categories.to_list())
+        self.assertEqual(100, result.isna().sum())
+        self.assertEqual((df['cat'] == 'A').sum() - result[df['cat'] == 'A'].isna().sum(), (result == 'X').sum())
+        # a categorical action on a categorical header
+        action = {0: {'method': 'get_category', 'selection': ['X', 'Y'], 'categorical': True}}
+        result = tools.correlate_categories(df, 'cat', correlations=[['A']], actions=action, seed=31)
+        self.assertIsInstance(result, pd.Categorical)
+        self.assertTrue(set(result[df['cat'] == 'A']).issubset({'X', 'Y'}))
+        self.assertEqual(df['cat'][df['cat'] != 'A'].to_list(), result[df['cat'] != 'A'].to_list())
 
     def test_correlate_date(self):
         tools = self.tools
@@ -200,6 +215,11 @@ class SyntheticIntentCorrelateTest(unittest.TestCase):
         result = tools.correlate_dates(df, 'dates', spread=5, max_date="2018/01/01", date_format='%Y/%m/%d')
         self.assertEqual("2018/01/01", pd.Series(result).max())
         self.assertEqual("2017/12/30", pd.Series(result).min())
+        # a min and max the dates are already within
+        result = tools.correlate_dates(df, 'dates', min_date="2017/01/01", max_date="2019/01/01")
+        self.assertEqual(df['dates'].to_list(), result)
+        with self.assertRaises(ValueError):
+            tools.correlate_dates(df, 'dates', min_date="2019/01/01")
 
 
 
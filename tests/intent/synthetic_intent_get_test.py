@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 from ds_behavioral.intent.synthetic_intent_model import SyntheticIntentModel
 from ds_behavioral import SyntheticBuilder
+from ds_behavioral.managers.synthetic_property_manager import SyntheticPropertyManager
 from aistac.properties.property_manager import PropertyManager
 
 
@@ -88,6 +89,31 @@ class SyntheticIntentGetTest(unittest.TestCase):
         result = tools.get_number(10, 20, precision=0, at_most=2, size=sample_size)
         self.assertEqual(2, pd.Series(result).value_counts().max())
         self.assertEqual(sample_size, len(result))
+        # at_most across weighted bins
+        result = tools.get_number(1, 1000, weight_pattern=[1, 0, 3, 2], at_most=1, size=500)
+        self.assertEqual(500, pd.Series(result).nunique())
+        with self.assertRaises(ValueError):
+            tools.get_number(1, 3, weight_pattern=[1, 1], at_most=1, size=10)
+        # a range too small to choose each value at most at_most times raises rather than returning short
+        with self.assertRaises(ValueError):
+            tools.get_number(0, 10, at_most=1, size=20, seed=1)
+        with self.assertRaises(ValueError):
+            tools.get_category(['a', 'b'], at_most=1, size=5)
+
+    def test_get_identifiers(self):
+        tools = self.tools
+        result = tools.get_identifiers(10**12, size=100000, prefix='C', seed=31)
+        self.assertEqual(100000, pd.Series(result).nunique())
+        self.assertTrue(all(x.startswith('C') for x in result))
+        # streamed in chunks
+        chunks = []
+        for skip in range(0, 100000, 25000):
+            chunks += tools.get_identifiers(10**12, size=25000, prefix='C', skip=skip, seed=31)
+        self.assertEqual(result, chunks)
+        result = tools.get_identifiers(10, 20, size=10)
+        self.assertCountEqual([str(x) for x in range(10, 20)], result)
+        with self.assertRaises(ValueError):
+            tools.get_identifiers(10, 20, size=11)
 
     def test_get_number_large(self):
         tools = self.tools
@@ -130,6 +156,182 @@ class SyntheticIntentGetTest(unittest.TestCase):
         self.assertGreaterEqual(result.min(), 15)
         self.assertLess(result.max(), 20)
 
+    def test_get_number_alias(self):
+        tools = self.tools
+        result = tools.get_category(list('abcd'), weight_pattern=[1, 0, 3, 6], size=10000, seed=31)
+        result = pd.Series(result).value_counts(normalize=True)
+        self.assertNotIn('b', result.index)
+        self.assertAlmostEqual(0.6, result['d'], delta=0.02)
+        self.assertAlmostEqual(0.1, result['a'], delta=0.02)
+        result = tools.get_number(0.0, 1.0, weight_pattern=[0, 1], bounded_weighting=False, size=1000, seed=31)
+        self.assertTrue(all(0.5 <= x < 1.0 for x in result))
+        # the alias table is memoized, read only and never aliases to a zero weight
+        (prob, alias) = tools._alias_table((1.0, 0.0, 3.0, 6.0))
+        self.assertIs(prob, tools._alias_table((1.0, 0.0, 3.0, 6.0))[0])
+        self.assertFalse(prob.flags.writeable)
+        self.assertEqual(0, prob[1])
+        self.assertNotIn(1, alias[prob < 1])
+        with self.assertRaises(ValueError):
+            tools._alias_table((0.0, 0.0))
+
+    def test_get_seeded(self):
+        tools = self.tools
+        state = np.random.get_state()[1].copy()
+        result = tools.get_number(10, 1000, weight_pattern=[1, 2, 3], size=1000, seed=31)
+        self.assertEqual(result, tools.get_number(10, 1000, weight_pattern=[1, 2, 3], size=1000, seed=31))
+        result = tools.get_category(list('abcd'), weight_pattern=[1, 2, 3, 4], size=1000, seed=31)
+        self.assertEqual(result, tools.get_category(list('abcd'), weight_pattern=[1, 2, 3, 4], size=1000, seed=31))
+        result = tools.get_datetime('2020-01-01', '2021-01-01', size=1000, seed=31)
+        self.assertEqual(result, tools.get_datetime('2020-01-01', '2021-01-01', size=1000, seed=31))
+        # the global numpy random state is left untouched
+        self.assertTrue(np.array_equal(state, np.random.get_state()[1]))
+
+    def test_get_datetime_pattern(self):
+        tools = self.tools
+        sample_size = 10000
+        result = tools.get_datetime_pattern('2015-01-01', '2021-01-01', year_pattern=[1, 0, 0, 0, 0, 1],
+                                            size=sample_size, seed=31)
+        result = pd.Series(result)
+        self.assertEqual(sample_size, result.size)
+        self.assertCountEqual([2015, 2020], result.dt.year.unique())
+        result = tools.get_datetime_pattern('2020-01-01', '2021-01-01', month_pattern=[1] * 6 + [0] * 6,
+                                            weekday_pattern=[1, 1, 1, 1, 1, 0, 0],
+                                            hour_pattern=[0] * 9 + [1] * 8 + [0] * 7, size=sample_size, seed=31)
+        result = pd.Series(result)
+        self.assertEqual(0, result.isna().sum())
+        self.assertLess((result.dt.month > 6).mean(), 0.05)
+        self.assertLess(result.dt.dayofweek.max(), 5)
+        self.assertLess((~result.dt.hour.between(9, 16)).mean(), 0.01)
+        result = tools.get_datetime_pattern('2020-01-01', '2021-01-01', default='2020-06-15', date_format='%Y-%m-%d',
+                                            size=sample_size)
+        self.assertEqual(['2020-06-15'], pd.Series(result).unique().tolist())
+        result = tools.get_datetime_pattern('2020-01-01', '2021-01-01', year_pattern=[0], size=10)
+        self.assertEqual(10, pd.Series(result).isna().sum())
+        # the date bin tables are memoized and shared
+        table = tools._date_bin_table(pd.Timestamp('2020-01-01'), pd.Timestamp('2021-01-01'), 'D', (1, 0, 2))
+        self.assertIs(table, tools._date_bin_table(pd.Timestamp('2020-01-01'), pd.Timestamp('2021-01-01'), 'D',
+                                                   (1, 0, 2)))
+        self.assertFalse(table[0].flags.writeable)
+
+    def test_get_quantity(self):
+        tools = self.tools
+        result = tools.get_number(1.0, 100.0, quantity=0.9, size=10000, seed=31)
+        self.assertEqual(1000, pd.Series(result).isna().sum())
+        result = tools.get_category(list('abc'), quantity=0.75, size=10000, seed=31)
+        self.assertEqual(2500, result.count(''))
+        result = tools.get_number(1, 100, quantity=0.99, size=10000, seed=31)
+        self.assertEqual(100, result.count(None))
+        self.assertTrue(all(isinstance(x, np.int64) for x in result if x is not None))
+        result = tools.get_number(1, 100, quantity=0.5, size=50, seed=31)
+        self.assertEqual(50, len(result))
+        # mixed lists are filled with the null of each element type without an element by element loop
+        result = tools._set_quantity([1.5, 'a', 2] * 1000, quantity=0.5, generator=np.random.default_rng(31))
+        self.assertEqual(1500, sum(1 for x in result if x is None or x == '' or (isinstance(x, float) and np.isnan(x))))
+        self.assertTrue(all(isinstance(x, float) for x in result[::3]))
+
+    def test_get_distribution(self):
+        tools = self.tools
+        result = tools.get_distribution(method='beta', a=2, b=5, offset=10, precision=2, size=1000, seed=31)
+        self.assertEqual(1000, len(result))
+        self.assertTrue(all(0 <= x <= 10 and round(x, 2) == x for x in result))
+        self.assertEqual(result, tools.get_distribution(method='beta', a=2, b=5, offset=10, precision=2, size=1000,
+                                                        seed=31))
+        result = tools.get_distribution(method='randint', low=0, high=5, size=1000, seed=31)
+        self.assertCountEqual([0, 1, 2, 3, 4], set(result))
+        with self.assertRaises(ValueError) as context:
+            tools.get_distribution(method='unknown')
+        self.assertTrue("'unknown'" in str(context.exception))
+
+    def test_get_custom(self):
+        tools = self.tools
+        result = tools.get_custom('round(generator.normal(loc=loc, scale=scale), 3)', loc=10, scale=1, size=1000,
+                                  seed=31)
+        self.assertEqual(1000, len(result))
+        self.assertEqual(result, tools.get_custom('round(generator.normal(loc=loc, scale=scale), 3)', loc=10,
+                                                  scale=1, size=1000, seed=31))
+        # vectorized evaluates the code once returning all the values
+        other = tools.get_custom('np.round(generator.normal(loc=loc, scale=scale, size=size), 3)', loc=10, scale=1,
+                                 vectorized=True, size=1000, seed=31)
+        self.assertEqual(result, other)
+        with self.assertRaises(ValueError) as context:
+            tools.get_custom('generator.normal(size=2)', vectorized=True, size=1000)
+        self.assertTrue("length 1000" in str(context.exception))
+        # code using np.random is reproducible from the seed without the global random state
+        state = np.random.get_state()[1].copy()
+        result = tools.get_custom('round(np.random.normal(loc=0, scale=1), 3)', size=100, seed=31)
+        self.assertEqual(result, tools.get_custom('round(np.random.normal(loc=0, scale=1), 3)', size=100, seed=31))
+        self.assertTrue(np.array_equal(state, np.random.get_state()[1]))
+        # the code is compiled once
+        self.assertIs(SyntheticIntentModel._compile_code('1 + 1'), SyntheticIntentModel._compile_code('1 + 1'))
+
+    def test_get_string_pattern(self):
+        tools = self.tools
+        result = tools.get_string_pattern('Ud-dl', size=1000, seed=31)
+        self.assertTrue(all(len(x) == 5 and x[0].isupper() and x[1].isdigit() and x[2] == '-' and
+                            x[3].isdigit() and x[4].islower() for x in result))
+        self.assertEqual(result, tools.get_string_pattern('Ud-dl', size=1000, seed=31))
+        result = tools.get_string_pattern('xx-x', choices={'x': ['ab', 'é']}, choice_only=True, size=1000, seed=31)
+        options = ['ab', 'é']
+        self.assertCountEqual([a + b + c for a in options for b in options for c in options], set(result))
+        # the compiled plan is memoized and read only
+        plan = SyntheticIntentModel._string_pattern_plan('Ud-dl')
+        self.assertIs(plan, SyntheticIntentModel._string_pattern_plan('Ud-dl'))
+        self.assertTrue(plan[1])
+        self.assertFalse(plan[0][0].flags.writeable)
+
+    def test_get_tagged_pattern(self):
+        tools = self.tools
+        tags = {'<name>': {'action': 'get_category', 'kwargs': {'selection': ['Jo', 'Al']}},
+                '<num>': {'action': 'get_number', 'kwargs': {'range_value': 1, 'to_value': 10}},
+                '<company>': {'action': 'ACME'}}
+        result = tools.get_tagged_pattern(['Hi <name> at <company>', '<num>-<num>', 'plain'], tags=tags,
+                                          size=1000, seed=31)
+        self.assertEqual(1000, len(result))
+        self.assertCountEqual(['Hi Jo at ACME', 'Hi Al at ACME', 'plain'],
+                              [x for x in set(result) if not x[0].isdigit()])
+        # a tag used twice in a pattern takes the same value
+        self.assertTrue(all(x.split('-')[0] == x.split('-')[1] for x in result if x[0].isdigit()))
+        self.assertEqual(result, tools.get_tagged_pattern(['Hi <name> at <company>', '<num>-<num>', 'plain'],
+                                                          tags=tags, size=1000, seed=31))
+        result = tools.get_tagged_pattern('<num>', tags=tags, quantity=0.9, size=1000, seed=31)
+        self.assertEqual(100, result.count(''))
+
+    def test_get_category_categorical(self):
+        tools = self.tools
+        result = tools.get_category(['M', 'F', 'U', 'M'], weight_pattern=[5, 4, 1, 1], size=1000, seed=31,
+                                    categorical=True)
+        self.assertIsInstance(result, pd.Categorical)
+        self.assertEqual(['M', 'F', 'U'], result.categories.to_list())
+        self.assertEqual(tools.get_category(['M', 'F', 'U', 'M'], weight_pattern=[5, 4, 1, 1], size=1000, seed=31),
+                         result.to_list())
+        result = tools.get_category(list('abc'), quantity=0.9, size=1000, seed=31, categorical=True)
+        self.assertEqual(100, result.isna().sum())
+        result = tools.get_profile_surname(size=100, seed=31, categorical=True)
+        self.assertIsInstance(result, pd.Categorical)
+
+    def test_get_return_type(self):
+        tools = SyntheticIntentModel(property_manager=SyntheticPropertyManager('test', 'test'),
+                                     default_save_intent=False, return_type='array')
+        self.assertEqual('array', tools.return_type)
+        result = tools.get_number(1, 100, size=1000, seed=31)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual('int64', result.dtype)
+        result = tools.get_number(1, 100, quantity=0.9, size=1000, seed=31)
+        self.assertEqual('Int64', result.dtype)
+        self.assertEqual(100, pd.isna(result).sum())
+        result = tools.get_number(1.0, 100.0, quantity=0.9, size=1000, seed=31)
+        self.assertEqual('float64', result.dtype)
+        self.assertEqual(100, np.isnan(result).sum())
+        result = tools.get_category(list('abc'), quantity=0.9, size=1000, seed=31)
+        self.assertEqual('string', result.dtype)
+        self.assertEqual(100, pd.isna(result).sum())
+        result = tools.get_datetime('2020-01-01', '2021-01-01', quantity=0.9, size=1000, seed=31)
+        self.assertEqual('datetime64[ns]', result.dtype)
+        self.assertEqual(100, pd.isna(result).sum())
+        # the same values as the list return type
+        self.assertEqual(tools.get_category(list('abc'), size=1000, seed=31).tolist(),
+                         self.tools.get_category(list('abc'), size=1000, seed=31))
+
     def test_get_datetime_at_most(self):
         tools = self.tools
         sample_size = 10000
@@ -144,6 +346,11 @@ class SyntheticIntentGetTest(unittest.TestCase):
         self.assertEqual(1, pd.Series(result).nunique())
         result = tools.get_datetime(0, 1, date_format="%Y-%m-%d", ignore_time=True, size=sample_size)
         self.assertEqual(pd.Timestamp.now().strftime("%Y-%m-%d"), pd.Series(result).value_counts().index[0])
+        result = tools.get_datetime('2020-01-01', '2020-01-02', size=sample_size)
+        self.assertTrue(all(isinstance(x, pd.Timestamp) and x.tz is None for x in result))
+        # the number of days since the epoch
+        result = tools.get_datetime('2020-01-01', '2020-01-02', as_num=True, size=sample_size)
+        self.assertTrue(all(18262 <= x < 18263 for x in result))
 
 
 
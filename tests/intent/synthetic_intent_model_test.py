@@ -35,7 +35,10 @@ class SyntheticIntentModelTest(unittest.TestCase):
 
     def test_model_noise(self):
         result = self.tools.model_noise(num_columns=2, inc_targets=True, size=20)
-        print(result)
+        self.assertEqual((20, 4), result.shape)
+        self.assertTrue(result.iloc[:, :2].apply(lambda x: x.between(0, 1)).all().all())
+        result = self.tools.model_noise(num_columns=3, size=20, seed=31)
+        self.assertTrue(result.equals(self.tools.model_noise(num_columns=3, size=20, seed=31)))
 
     def test_raise(self):
         with self.assertRaises(KeyError) as context:
@@ -1,6 +1,8 @@
 import unittest
 import os
 import shutil
+import warnings
+from unittest import mock
 import pandas as pd
 import numpy as np
 from ds_behavioral import SyntheticBuilder
@@ -46,6 +48,103 @@ class SyntheticPipelineTest(unittest.TestCase):
         self.assertEqual(1, result['numbers'].value_counts().index[0])
         self.assertEqual(size, result['numbers'].value_counts().values[0])
 
+    def test_run_synthetic_pipeline_shards(self):
+        sb = self.builder
+        tools = self.builder.intent_model
+        tools.get_number(1, 1000, column_name='numbers')
+        tools.get_category(selection=['M', 'F'], column_name='gender')
+        sb.set_outcome()
+        sb.run_synthetic_pipeline(size=101, shards=3, seed=31)
+        result = sb.load_synthetic_canonical()
+        self.assertEqual((101, 2), result.shape)
+        self.assertEqual(list(range(101)), result.index.to_list())
+        sb.run_synthetic_pipeline(size=101, shards=3, seed=31)
+        other = sb.load_synthetic_canonical()
+        self.assertEqual(result['numbers'].to_list(), other['numbers'].to_list())
+        self.assertEqual(result['gender'].to_list(), other['gender'].to_list())
+
+    def test_run_synthetic_pipeline_shards_identifiers(self):
+        sb = self.builder
+        tools = self.builder.intent_model
+        tools.get_identifiers(0, 1000, seed=7, column_name='ids')
+        sb.set_outcome()
+        sb.run_synthetic_pipeline(size=600, shards=3, seed=1)
+        result = sb.load_synthetic_canonical()
+        # identifiers are unique across shards not just within them
+        self.assertEqual(600, result['ids'].nunique())
+        # each shard is run as the chunk at its offset
+        other = pd.concat(tools.run_intent_pipeline(size=600, chunk_size=200, seed=1), ignore_index=True)
+        self.assertEqual(other['ids'].to_list(), result['ids'].to_list())
+
+    def test_run_synthetic_pipeline_profile(self):
+        sb = self.builder
+        tools = self.builder.intent_model
+        tools.get_number(1, 1000, column_name='numbers')
+        tools.get_category(selection=['M', 'F'], column_name='gender')
+        tools.correlate_numbers(pd.DataFrame({'numbers': [1]}), header='numbers', offset=2, column_name='offset')
+        tools.run_intent_pipeline(size=100, profile=True)
+        self.assertEqual(['numbers', 'gender', 'offset'], [r.get('column') for r in tools.intent_profile])
+        sb.set_outcome()
+        sb.run_synthetic_pipeline(size=101, shards=2, seed=31, profile=True)
+        result = sb.report_pipeline_profile(stylise=False)
+        self.assertEqual(['numbers', 'gender', 'offset'], result.index.to_list())
+        self.assertEqual(['get_number', 'get_category', 'correlate_numbers'], result['intent'].to_list())
+        self.assertEqual([101, 101, 101], result['rows'].to_list())
+        self.assertTrue(all(result['wall_time'] > 0))
+        self.assertTrue(all(result['peak_memory'] >= 0))
+
+    def test_run_intent_pipeline_cache(self):
+        tools = self.builder.intent_model
+        tools.get_number(1, 1000, column_name='numbers')
+        tools.get_category(selection=['M', 'F'], column_name='gender')
+        tools.correlate_numbers(pd.DataFrame({'numbers': [1]}), header='numbers', offset=2, column_name='offset')
+        for cache in [True, os.path.join('work', 'cache')]:
+            result = tools.run_intent_pipeline(size=100, seed=31, cache=cache, profile=True)
+            self.assertEqual(3, len(tools.intent_profile))
+            other = tools.run_intent_pipeline(size=100, seed=31, cache=cache, profile=True)
+            self.assertEqual(0, len(tools.intent_profile))
+            self.assertTrue(result.equals(other))
+            # only the changed column and its dependants are rerun
+            tools.get_number(1, 10, column_name='numbers')
+            other = tools.run_intent_pipeline(size=100, seed=31, cache=cache, profile=True)
+            self.assertEqual(['numbers', 'offset'], [r.get('column') for r in tools.intent_profile])
+            self.assertEqual(result['gender'].to_list(), other['gender'].to_list())
+            tools.get_number(1, 1000, column_name='numbers')
+            # without a seed the columns are random so never cached
+            tools.run_intent_pipeline(size=100, cache=cache, profile=True)
+            self.assertEqual(3, len(tools.intent_profile))
+
+    def test_run_intent_pipeline_cache_nested_action(self):
+        tools = self.builder.intent_model
+        tools.get_number(1, 1000, column_name='numbers')
+        tools.correlate_join(pd.DataFrame({'numbers': [1]}), header='numbers', sep='-', column_name='random',
+                             action={'method': 'get_number', 'range_value': 1, 'to_value': 1000})
+        tools.correlate_join(pd.DataFrame({'numbers': [1]}), header='numbers', sep='-', column_name='seeded',
+                             action={'method': 'get_number', 'range_value': 1, 'to_value': 1000, 'seed': 3})
+        result = tools.run_intent_pipeline(size=100, seed=31, cache=True)
+        other = tools.run_intent_pipeline(size=100, seed=31, cache=True, profile=True)
+        # the unseeded nested action is random so its column is never cached
+        self.assertEqual(['random'], [r.get('column') for r in tools.intent_profile])
+        self.assertEqual(result['seeded'].to_list(), other['seeded'].to_list())
+
+    def test_run_intent_pipeline_cache_code_str(self):
+        tools = self.builder.intent_model
+        tools.get_number(1, 1000, column_name='numbers')
+        tools.correlate_custom(pd.DataFrame({'numbers': [1]}), column_name='noise',
+                               code_str="canonical['numbers'] + np.random.random(canonical.shape[0])")
+        tools.run_intent_pipeline(size=4, seed=31, cache=True)
+        tools.run_intent_pipeline(size=4, seed=31, cache=True, profile=True)
+        # a code string may draw at random so its column is never cached
+        self.assertEqual(['noise'], [r.get('column') for r in tools.intent_profile])
+
+    def test_run_intent_pipeline_cache_parquet_engine(self):
+        tools = self.builder.intent_model
+        tools.get_number(1, 1000, column_name='numbers')
+        # without a Parquet engine the directory cache is refused up front
+        with mock.patch('importlib.util.find_spec', return_value=None):
+            with self.assertRaises(ImportError):
+                tools.run_intent_pipeline(size=10, seed=31, cache=os.path.join('work', 'cache'))
+
     def test_run_intent_pipeline_get(self):
         tools = self.builder.intent_model
         tools.get_number(1, 2, column_name='numbers')
@@ -76,6 +175,82 @@ class SyntheticPipelineTest(unittest.TestCase):
         self.assertEqual(1, result['corr_plus'].value_counts().size)
         self.assertEqual(3, result['corr_plus'].value_counts().index[0])
 
+    def test_run_intent_pipeline_workers(self):
+        tools = self.builder.intent_model
+        df = pd.DataFrame()
+        df['numbers'] = tools.get_number(1, 2, column_name='numbers')
+        df['gender'] = tools.get_category(selection=['M'], column_name='gender')
+        df['corr_plus'] = tools.correlate_numbers(df, offset=1, header='numbers', column_name='corr_plus')
+        selection = [tools.select2dict(column='gender', condition="=='M'")]
+        action = tools.action2dict(method='@header', header='corr_plus')
+        df['select'] = tools.correlate_selection(df, selection=selection, action=action, column_name='select')
+        result = tools._intent_dependencies()
+        self.assertEqual(set(), result.get('numbers'))
+        self.assertEqual(set(), result.get('gender'))
+        self.assertEqual({'numbers'}, result.get('corr_plus'))
+        self.assertEqual({'gender', 'corr_plus'}, result.get('select'))
+        result = tools.run_intent_pipeline(size=10, workers=4)
+        self.assertEqual((10, 4), result.shape)
+        self.assertCountEqual(['numbers', 'gender', 'corr_plus', 'select'], result.columns)
+        self.assertEqual([2] * 10, result['corr_plus'].to_list())
+        self.assertEqual([2] * 10, result['select'].to_list())
+
+    def test_run_intent_pipeline_chunks(self):
+        tools = self.builder.intent_model
+        df = pd.DataFrame()
+        df['numbers'] = tools.get_number(1, 100, column_name='numbers')
+        df['corr_plus'] = tools.correlate_numbers(df, offset=1, header='numbers', column_name='corr_plus')
+        result = tools.run_intent_pipeline(size=10, chunk_size=4, seed=31)
+        chunks = list(result)
+        self.assertEqual([4, 4, 2], [c.shape[0] for c in chunks])
+        self.assertEqual([0, 4, 8], [c.index[0] for c in chunks])
+        result = pd.concat(chunks)
+        self.assertEqual((result['numbers'] + 1).to_list(), result['corr_plus'].to_list())
+        # each chunk is reproducible from the seed
+        other = pd.concat(tools.run_intent_pipeline(size=10, chunk_size=4, seed=31))
+        self.assertTrue(result.equals(other))
+
+    def test_run_intent_pipeline_chunks_identifiers(self):
+        tools = self.builder.intent_model
+        tools.get_identifiers(1, 100, column_name='ids')
+        result = pd.concat(tools.run_intent_pipeline(size=50, chunk_size=7, seed=31))
+        # identifiers are unique across chunks not just within them
+        self.assertTrue(result['ids'].is_unique)
+        # an in-memory cache would hold every chunk so only a directory cache can be used
+        with self.assertRaises(ValueError):
+            tools.run_intent_pipeline(size=50, chunk_size=7, seed=31, cache=True)
+        cache = os.path.join('work', 'cache')
+        other = pd.concat(tools.run_intent_pipeline(size=50, chunk_size=7, seed=31, cache=cache))
+        self.assertTrue(result.equals(other))
+        other = pd.concat(tools.run_intent_pipeline(size=50, chunk_size=7, seed=31, cache=cache))
+        self.assertTrue(result.equals(other))
+
+    def test_run_intent_pipeline_wide(self):
+        tools = self.builder.intent_model
+        for i in range(120):
+            tools.get_number(1, 2, column_name=f"num_{i}")
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', pd.errors.PerformanceWarning)
+            result = tools.run_intent_pipeline(size=10)
+        self.assertEqual((10, 120), result.shape)
+        self.assertEqual([f"num_{i}" for i in range(120)], result.columns.to_list())
+
+    def test_run_intent_pipeline_plan_cache(self):
+        tools = self.builder.intent_model
+        tools.get_number(1, 2, column_name='numbers')
+        plan = tools._compile_intent()
+        self.assertEqual(['numbers'], plan.get('columns'))
+        self.assertIs(plan, tools._compile_intent())
+        _ = tools.run_intent_pipeline(size=10)
+        self.assertIs(plan, tools._compile_intent())
+        # a change to the contract invalidates the plan
+        tools.get_category(selection=['M'], column_name='gender')
+        other = tools._compile_intent()
+        self.assertIsNot(plan, other)
+        self.assertEqual(['numbers', 'gender'], other.get('columns'))
+        result = tools.run_intent_pipeline(size=10)
+        self.assertCountEqual(['numbers', 'gender'], result.columns)
+
     def test_run_intent_pipeline_associate(self):
         tools = self.builder.intent_model
         df = pd.DataFrame()